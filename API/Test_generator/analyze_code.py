@@ -1,7 +1,10 @@
 import os
+import time
 import json
 from typing import Dict, List, Any, Optional, Union
 from openai import OpenAI
+from .metrics import record_tokens
+from .prompts import VALID_LANGUAGES, language_detection_messages, analysis_messages
 
 
 
@@ -33,36 +36,20 @@ class CodeAnalyzer:
         Returns:
             str: Detected programming language (e.g., 'python', 'javascript', etc.)
         """
-        prompt = f"""
-        Analyze the following code and determine the programming language.
-        
-        Code:
-        {code}
-        
-        Return ONLY the language name in lowercase (e.g., 'python', 'javascript', 'typescript', 'java', 'cpp', 'c', 'csharp', 'go', 'rust', 'php', 'ruby', 'swift', 'kotlin').
-        If you cannot determine the language, return 'unknown'.
-        """
-        
         try:
+            started = time.perf_counter()
             response = self.client.chat.completions.create(
                 model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a programming language detection expert. Return only the language name in lowercase."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=language_detection_messages(code),
                 temperature=0.1,
                 max_tokens=50
             )
+            record_tokens(response, "detection", (time.perf_counter() - started) * 1000)
             
             language = response.choices[0].message.content.strip().lower()
             
             # Validity check: Clean up the response to ensure it's a valid language name
-            valid_languages = {
-                'python', 'javascript', 'typescript', 'java', 'cpp', 'c', 'csharp', 
-                'go', 'rust', 'php', 'ruby', 'swift', 'kotlin', 'jsx', 'tsx'
-            }
-            
-            if language in valid_languages:
+            if language in VALID_LANGUAGES:
                 return language
             else:
                 return 'unknown'
@@ -71,80 +58,23 @@ class CodeAnalyzer:
             print(f"Language detection error: {e}")
             return 'unknown'
     
-    def _analyze_with_openai(self, code: str) -> Dict[str, Any]:
+    def _analyze_with_openai(self, code: str, language: Optional[str] = None) -> Dict[str, Any]:
         """Use OpenAI API to get detailed analysis of the code."""
 
-        # Detect language using GPT
-        language = self._detect_language_with_gpt(code)
-        print(f"Detected language: {language}")
+        # Detect language using GPT unless the caller already knows it
+        if language is None:
+            language = self._detect_language_with_gpt(code)
+            print(f"Detected language: {language}")
 
-        prompt = f"""
-        Analyze the following {language} code and provide detailed information about:
-        1. All functions and their parameters, return types, and purpose
-        2. All classes, their methods, attributes, and inheritance
-        3. Any complex logic or patterns used
-        4. Potential issues or improvements
-        
-        Code:
-        {code}
-        
-        Please provide your analysis in JSON format with the following structure:
-        If the code does not use classes or certain structures or if analyzing a functional language, describe modules, main data structures, and key functions instead of classes.
-        {{
-            "functions": [
-                {{
-                    "name": "function_name",
-                    "description": "what the function does",
-                    "parameters": [
-                        {{
-                            "name": "param_name",
-                            "type": "param_type",
-                            "description": "what the parameter is for"
-                        }}
-                    ],
-                    "return_type": "return_type",
-                    "return_description": "what the function returns",
-                    "complexity": "simple/medium/complex"
-                }}
-            ],
-            "classes": [
-                {{
-                    "name": "class_name",
-                    "description": "what the class represents",
-                    "methods": [
-                        {{
-                            "name": "method_name",
-                            "description": "what the method does",
-                            "parameters": [...],
-                            "return_type": "return_type",
-                            "return_description": "what the method returns"
-                        }}
-                    ],
-                    "attributes": [
-                        {{
-                            "name": "attr_name",
-                            "type": "attr_type",
-                            "description": "what the attribute stores"
-                        }}
-                    ],
-                    "inheritance": "base classes if any"
-                }}
-            ],
-            "overall_complexity": "simple/medium/complex"
-            
-        }}
-        """
-        
         try:
+            started = time.perf_counter()
             response = self.client.chat.completions.create(
                 model="gpt-4",
-                messages=[
-                    {"role": "system", "content": "You are a code analysis expert. Provide detailed, accurate analysis of code structure and functionality."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=analysis_messages(code, language),
                 temperature=0.1,
                 max_tokens=2000
             )
+            record_tokens(response, "analysis", (time.perf_counter() - started) * 1000)
             
             # Parse the JSON response
             analysis_text = response.choices[0].message.content.strip()
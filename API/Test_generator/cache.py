@@ -0,0 +1,68 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Any, Hashable, Optional
+
+
+class LRUCache:
+    """
+    A small in-process least-recently-used cache with optional expiry.
+
+    Safe to share between threads: prefetch workers write entries while request
+    threads read and pop them, so every operation runs under one lock.
+    """
+
+    def __init__(self, maxsize: int = 1024, ttl: Optional[float] = None):
+        """
+        Initialize the LRUCache.
+
+        Args:
+            maxsize: Maximum number of entries kept before the least recently used is evicted.
+            ttl: Seconds after which an entry expires. If None, entries never expire.
+        """
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._entries: "OrderedDict[Hashable, Any]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Return the cached value for key, marking it as recently used."""
+        with self._lock:
+            if not self._live(key):
+                return default
+            self._entries.move_to_end(key)
+            return self._entries[key][0]
+
+    def put(self, key: Hashable, value: Any) -> None:
+        """Store a value, evicting the least recently used entry if the cache is full."""
+        expires = time.monotonic() + self.ttl if self.ttl is not None else None
+        with self._lock:
+            self._entries[key] = (value, expires)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.maxsize:
+                self._entries.popitem(last=False)
+
+    def pop(self, key: Hashable, default: Optional[Any] = None) -> Any:
+        """Remove and return the cached value for key."""
+        with self._lock:
+            if not self._live(key):
+                return default
+            return self._entries.pop(key)[0]
+
+    def __contains__(self, key: Hashable) -> bool:
+        with self._lock:
+            return self._live(key)
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+    def _live(self, key: Hashable) -> bool:
+        """Whether key holds an unexpired entry, dropping it if expired. Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return False
+        if entry[1] is not None and entry[1] < time.monotonic():
+            del self._entries[key]
+            return False
+        return True
@@ -0,0 +1,282 @@
+import re
+import json
+import keyword
+import time
+import zipfile
+from itertools import chain
+from collections import OrderedDict
+from typing import Dict, List, Any, Iterable, Iterator, Tuple
+
+
+# File extensions for languages without a dedicated renderer
+_EXTENSIONS = {
+    "python": "py", "javascript": "js", "jsx": "jsx", "typescript": "ts", "tsx": "tsx",
+    "java": "java", "cpp": "cpp", "c": "c", "csharp": "cs", "go": "go", "rust": "rs",
+    "php": "php", "ruby": "rb", "swift": "swift", "kotlin": "kt"
+}
+
+
+# Module names the exported tests can import the code under test from, per language family
+_MODULE_PATTERNS = {
+    # `from <module> import *`: a dotted Python name
+    "python": re.compile(r"[A-Za-z_]\w*(?:\.[A-Za-z_]\w*)*"),
+    # `require('./<module>')`: a relative path without `..` segments
+    "javascript": re.compile(r"[\w$-]+(?:\.[\w$-]+)*(?:/[\w$-]+(?:\.[\w$-]+)*)*")
+}
+_JAVASCRIPT_LANGUAGES = ("javascript", "jsx", "typescript", "tsx")
+
+
+def is_valid_module(module: str, languages: Iterable[str] = ("python", "javascript")) -> bool:
+    """
+    Whether exported tests in each of `languages` can import the code under test from `module`.
+
+    Python needs a dotted name such as `pkg.solution`, JavaScript a relative path such as
+    `lib/solution`. Other languages do not import the module, so any name is accepted.
+    """
+    for language in languages:
+        family = "javascript" if language in _JAVASCRIPT_LANGUAGES else language
+        pattern = _MODULE_PATTERNS.get(family)
+        if pattern is not None and not pattern.fullmatch(module):
+            return False
+        if family == "python" and any(keyword.iskeyword(part) for part in module.split(".")):
+            return False
+    return True
+
+
+def _identifier(text: str, fallback: str = "case") -> str:
+    """Turn free text into a snake_case identifier."""
+    name = re.sub(r"\W+", "_", str(text)).strip("_").lower()
+    if not name:
+        name = fallback
+    return name if not name[0].isdigit() else f"_{name}"
+
+
+def _file_stem(target: str) -> str:
+    """Turn a suite target such as `Calculator.add` into a safe file name stem."""
+    return re.sub(r"[^\w.-]+", "_", str(target)).strip("._") or "module"
+
+
+def _comment(text: str, marker: str) -> str:
+    return "\n".join(f"{marker} {line}".rstrip() for line in str(text).splitlines() or [""])
+
+
+def _indent(code: str, prefix: str) -> str:
+    return "\n".join(prefix + line if line.strip() else line for line in code.splitlines())
+
+
+def detect_language(tests: Dict[str, Any]) -> str:
+    """
+    Work out the language of a generated suite.
+
+    Uses the `language` recorded by the generator, falling back to the test framework
+    name and finally to the shape of the test code.
+    """
+    language = tests.get("language")
+    if language and language != "unknown":
+        return language
+
+    framework = str(tests.get("test_framework", "")).lower()
+    if any(name in framework for name in ("pytest", "unittest", "nose")):
+        return "python"
+    if any(name in framework for name in ("jest", "mocha", "jasmine", "vitest")):
+        return "javascript"
+
+    sample = " ".join(
+        case.get("test_code", "")
+        for suite in tests.get("test_suite", [])
+        for case in suite.get("test_cases", [])
+    )
+    if "expect(" in sample or "=>" in sample:
+        return "javascript"
+    if "assert " in sample or "def test" in sample:
+        return "python"
+    return "unknown"
+
+
+def _group_by_target(tests: Dict[str, Any], language: str) -> "OrderedDict[str, List[Dict[str, Any]]]":
+    """Group the suites of a result by target so each target gets one file."""
+    # pytest imports test files as modules, so their names must be identifiers
+    stem = (lambda target: _identifier(target, "module")) if language == "python" else _file_stem
+    groups: "OrderedDict[str, List[Dict[str, Any]]]" = OrderedDict()
+    for suite in tests.get("test_suite", []):
+        groups.setdefault(stem(suite.get("target", "module")), []).append(suite)
+    return groups
+
+
+def _imported_names(tests: Dict[str, Any]) -> List[str]:
+    """Top-level names under test, e.g. `Calculator` for a target of `Calculator.add`."""
+    names = OrderedDict()
+    for suite in tests.get("test_suite", []):
+        name = re.split(r"[.:#\s]", str(suite.get("target", "")))[0]
+        if re.fullmatch(r"[A-Za-z_$][\w$]*", name):
+            names[name] = None
+    return list(names)
+
+
+def _render_pytest(target: str, suites: List[Dict[str, Any]], module: str) -> str:
+    lines = [f'"""Tests for {target}, generated by Testmate.io."""', "import pytest", f"from {module} import *", ""]
+    used = set()
+    for suite in suites:
+        lines.append(f"# {suite.get('test_type', 'test')}: {suite.get('description', '')}".rstrip())
+        for case in suite.get("test_cases", []):
+            code = case.get("test_code", "").strip()
+            if re.search(r"^\s*(def test|class Test|async def test)", code, re.MULTILINE):
+                lines += ["", code, ""]
+                continue
+            name = _identifier(case.get("name", ""))
+            while name in used:
+                name += "_"
+            used.add(name)
+            lines += [
+                "",
+                f"def test_{name}():",
+                _indent(_comment(case.get("description", ""), "#"), "    "),
+                _indent(code or "pass", "    "),
+                ""
+            ]
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def _render_jest(target: str, suites: List[Dict[str, Any]], module: str, names: List[str]) -> str:
+    lines = [f"// Tests for {target}, generated by Testmate.io."]
+    if names:
+        lines.append(f"const {{ {', '.join(names)} }} = require('./{module}');")
+    lines.append("")
+    for suite in suites:
+        label = f"{target} ({suite.get('test_type', 'test')})"
+        lines.append(f"describe({json.dumps(label)}, () => {{")
+        for case in suite.get("test_cases", []):
+            code = case.get("test_code", "").strip()
+            if re.search(r"^\s*(test|it)\s*\(", code, re.MULTILINE):
+                lines.append(_indent(code, "  "))
+            else:
+                lines += [
+                    f"  test({json.dumps(case.get('name', 'test case'))}, () => {{",
+                    _indent(code, "    "),
+                    "  });"
+                ]
+        lines += ["});", ""]
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def _render_generic(target: str, suites: List[Dict[str, Any]], language: str) -> str:
+    comment = "#" if language in ("python", "ruby") else "//"
+    lines = [f"{comment} Tests for {target}, generated by Testmate.io.", ""]
+    for suite in suites:
+        for case in suite.get("test_cases", []):
+            lines += [_comment(f"{case.get('name', '')}: {case.get('description', '')}", comment), case.get("test_code", "").strip(), ""]
+    return "\n".join(lines).rstrip() + "\n"
+
+
+def render_test_files(tests: Dict[str, Any], module: str = "solution", prefix: str = "") -> Iterator[Tuple[str, str]]:
+    """
+    Render a generated test suite into runnable test files.
+
+    Python suites become pytest files `test_<target>.py`, JavaScript suites Jest files
+    `<target>.test.js`. Other languages get one file per target with the test code in
+    order. A SETUP.md with the framework and setup instructions is added.
+
+    Args:
+        tests: A test generation result with a `test_suite`
+        module: Module (or file without extension) the tests import the code under test from
+        prefix: Directory inside the archive to place the files in
+
+    Yields:
+        (path, content) for each file
+    """
+    language = detect_language(tests)
+    names = _imported_names(tests)
+
+    for target, suites in _group_by_target(tests, language).items():
+        if language == "python":
+            yield f"{prefix}test_{target}.py", _render_pytest(target, suites, module)
+        elif language in _JAVASCRIPT_LANGUAGES:
+            extension = _EXTENSIONS[language]
+            yield f"{prefix}{target}.test.{extension}", _render_jest(target, suites, module, names)
+        else:
+            yield f"{prefix}{target}_test.{_EXTENSIONS.get(language, 'txt')}", _render_generic(target, suites, language)
+
+    setup = [
+        "# Generated tests",
+        "",
+        f"Language: {language}",
+        f"Test framework: {tests.get('test_framework', 'unknown')}",
+        "",
+        str(tests.get("setup_instructions", "")).strip()
+    ]
+    yield f"{prefix}SETUP.md", "\n".join(setup).rstrip() + "\n"
+
+
+class _StreamBuffer:
+    """Write-only file object that hands written bytes back to the streaming generator."""
+
+    def __init__(self):
+        self._chunks: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._chunks.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._chunks)
+        self._chunks = []
+        return data
+
+
+def stream_zip(files: Iterable[Tuple[str, str]]) -> Iterator[bytes]:
+    """
+    Build a zip archive incrementally, yielding its bytes as each file is added.
+
+    The output stream is not seekable, so zipfile writes sizes in data descriptors after
+    each entry; only the file currently being compressed is held in memory.
+
+    Args:
+        files: (path, content) pairs, consumed lazily
+
+    Yields:
+        Chunks of the zip archive
+    """
+    buffer = _StreamBuffer()
+    with zipfile.ZipFile(buffer, mode="w", compression=zipfile.ZIP_DEFLATED) as archive:
+        for path, content in files:
+            info = zipfile.ZipInfo(path, date_time=time.localtime()[:6])
+            info.compress_type = zipfile.ZIP_DEFLATED
+            with archive.open(info, mode="w") as entry:
+                entry.write(content.encode("utf-8"))
+            chunk = buffer.drain()
+            if chunk:
+                yield chunk
+    yield buffer.drain()
+
+
+def export_results(results: Iterable[Dict[str, Any]], module: str = "solution") -> Iterator[bytes]:
+    """
+    Stream one or many generation results as a zip of test files.
+
+    A single result is written at the archive root; with several, each goes into its own
+    numbered directory (`001/`, `002_<filename>/`, ...). Results with an error are skipped.
+
+    Args:
+        results: Test generation results, consumed lazily
+        module: Module the tests import the code under test from
+    """
+    def files() -> Iterator[Tuple[str, str]]:
+        iterator = iter(results)
+        first = next(iterator, None)
+        second = next(iterator, None)
+        if second is None:
+            if first is not None and "error" not in first:
+                yield from render_test_files(first, module)
+            return
+        for index, result in enumerate(chain([first, second], iterator), start=1):
+            if "error" not in result:
+                # Batch upload results carry their filename, e.g. `003_calculator/`
+                stem = _file_stem(str(result.get("filename", "")).rsplit(".", 1)[0]) if result.get("filename") else ""
+                prefix = f"{index:03d}_{stem}/" if stem else f"{index:03d}/"
+                yield from render_test_files(result, module, prefix=prefix)
+
+    return stream_zip(files())
+
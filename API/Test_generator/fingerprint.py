@@ -0,0 +1,179 @@
+import re
+import ast
+import hashlib
+from typing import Dict, List, Set
+
+
+# Language-agnostic tokens: block/line comments are dropped, string literals are
+# normalized to a single quote style, everything else is kept as-is.
+_TOKEN = re.compile(
+    r"(?P<comment>/\*.*?\*/|//[^\n]*)"
+    r"|(?P<string>\"(?:\\.|[^\"\\\n])*\"|'(?:\\.|[^'\\\n])*'|`(?:\\.|[^`\\])*`)"
+    r"|(?P<word>[A-Za-z_$][\w$]*|\d[\w.]*)"
+    r"|(?P<space>\s+)"
+    r"|(?P<symbol>.)",
+    re.DOTALL
+)
+
+_SCOPES = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda, ast.ClassDef)
+
+
+def canonical_fingerprint(code: str) -> str:
+    """
+    Compute a fingerprint that ignores formatting-only differences in code.
+
+    Python code is fingerprinted from a normalized ast dump, so whitespace, comments,
+    docstrings, quote style and local variable names do not change the result. Code that
+    does not parse as Python, or is nested too deeply to normalize, is fingerprinted from
+    a token stream with comments removed, whitespace collapsed and string quotes normalized.
+
+    Args:
+        code: The source code to fingerprint
+
+    Returns:
+        Hex digest identifying the code up to trivial differences
+    """
+    try:
+        tree = ast.parse(code)
+        tree = _LocalRenamer().visit(_strip_docstrings(tree))
+        dump = ast.dump(tree, annotate_fields=False, include_attributes=False)
+    except (SyntaxError, ValueError, RecursionError, MemoryError):
+        # Deeply nested expressions that CPython still compiles can exhaust the recursive
+        # parser, renamer or dump; they are fingerprinted by their tokens instead
+        return "tok:" + hashlib.sha256(_token_stream(code).encode("utf-8")).hexdigest()
+    return "py:" + hashlib.sha256(dump.encode("utf-8")).hexdigest()
+
+
+def _token_stream(code: str) -> str:
+    """Render code as a whitespace- and comment-free token stream."""
+    tokens: List[str] = []
+    for match in _TOKEN.finditer(code):
+        kind = match.lastgroup
+        if kind in ("comment", "space"):
+            continue
+        text = match.group()
+        if kind == "string" and text[0] != "`":
+            text = "'" + text[1:-1].replace("\\" + text[0], text[0]) + "'"
+        tokens.append(text)
+    return "\x00".join(tokens)
+
+
+def _strip_docstrings(tree: ast.AST) -> ast.AST:
+    """Remove module, class and function docstrings, which carry no behaviour."""
+    for node in ast.walk(tree):
+        if isinstance(node, (ast.Module, ast.ClassDef, ast.FunctionDef, ast.AsyncFunctionDef)):
+            body = node.body
+            if body and isinstance(body[0], ast.Expr) and isinstance(body[0].value, ast.Constant) \
+                    and isinstance(body[0].value.value, str):
+                node.body = body[1:] or [ast.Pass()]
+    return tree
+
+
+def _bound_names(node: ast.AST) -> List[str]:
+    """
+    Names assigned inside a function body, in order of first appearance.
+
+    Nested functions, lambdas and classes are their own scopes; only their names are
+    bound here. Names declared global or nonlocal are excluded.
+    """
+    names: List[str] = []
+    excluded: Set[str] = set()
+    stack = list(reversed(node.body))
+    while stack:
+        child = stack.pop()
+        if isinstance(child, (ast.Global, ast.Nonlocal)):
+            excluded.update(child.names)
+            continue
+        if isinstance(child, _SCOPES):
+            if not isinstance(child, ast.Lambda):
+                names.append(child.name)
+            continue
+        if isinstance(child, ast.Name) and isinstance(child.ctx, (ast.Store, ast.Del)):
+            names.append(child.id)
+        elif isinstance(child, ast.ExceptHandler) and child.name:
+            names.append(child.name)
+        elif isinstance(child, ast.alias):
+            names.append((child.asname or child.name).split(".")[0])
+        stack.extend(reversed(list(ast.iter_child_nodes(child))))
+
+    seen: Set[str] = set()
+    return [name for name in names if name not in excluded and not (name in seen or seen.add(name))]
+
+
+class _LocalRenamer(ast.NodeTransformer):
+    """
+    Alpha-rename local variables of functions to positional placeholders.
+
+    Parameters are part of a function's interface (tests may pass them by keyword),
+    and module-level names are what tests import, so neither is renamed.
+    """
+
+    def __init__(self):
+        self.scopes: List[Dict[str, str]] = []
+
+    def _lookup(self, name: str) -> str:
+        for scope in reversed(self.scopes):
+            if name in scope:
+                return scope[name]
+        return name
+
+    def _visit_scope(self, node: ast.AST) -> ast.AST:
+        params = {arg.arg for arg in ast.walk(node.args) if isinstance(arg, ast.arg)} if hasattr(node, "args") else set()
+        if isinstance(node, ast.Lambda):
+            local_names: List[str] = []
+        else:
+            local_names = [name for name in _bound_names(node) if name not in params]
+        depth = len(self.scopes)
+        scope = {name: f"_v{depth}_{i}" for i, name in enumerate(local_names)}
+        # Parameters shadow outer locals without being renamed themselves
+        scope.update({param: param for param in params})
+        self.scopes.append(scope)
+        if isinstance(node.body, list):
+            node.body = [self.visit(statement) for statement in node.body]
+        else:
+            node.body = self.visit(node.body)
+        self.scopes.pop()
+        return node
+
+    def visit_FunctionDef(self, node: ast.FunctionDef) -> ast.AST:
+        # Decorators and defaults are evaluated in the enclosing scope
+        node.decorator_list = [self.visit(d) for d in node.decorator_list]
+        node.args.defaults = [self.visit(d) for d in node.args.defaults]
+        node.args.kw_defaults = [self.visit(d) if d is not None else None for d in node.args.kw_defaults]
+        node.name = self._lookup(node.name)
+        return self._visit_scope(node)
+
+    visit_AsyncFunctionDef = visit_FunctionDef
+
+    def visit_Lambda(self, node: ast.Lambda) -> ast.AST:
+        node.args.defaults = [self.visit(d) for d in node.args.defaults]
+        return self._visit_scope(node)
+
+    def visit_ClassDef(self, node: ast.ClassDef) -> ast.AST:
+        # Class bodies are not renamed: their names become attributes
+        node.name = self._lookup(node.name)
+        self.scopes.append({})
+        self.generic_visit(node)
+        self.scopes.pop()
+        return node
+
+    def visit_Name(self, node: ast.Name) -> ast.AST:
+        node.id = self._lookup(node.id)
+        return node
+
+    def visit_Nonlocal(self, node: ast.Nonlocal) -> ast.AST:
+        node.names = [self._lookup(name) for name in node.names]
+        return node
+
+    def visit_ExceptHandler(self, node: ast.ExceptHandler) -> ast.AST:
+        if node.name:
+            node.name = self._lookup(node.name)
+        self.generic_visit(node)
+        return node
+
+    def visit_alias(self, node: ast.alias) -> ast.AST:
+        local = (node.asname or node.name).split(".")[0]
+        renamed = self._lookup(local)
+        if renamed != local:
+            node.asname = renamed
+        return node
@@ -1,14 +1,36 @@
 import os
+import time
+import copy
 import json
-from typing import Dict, List, Any, Optional, Union
+import threading
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from concurrent.futures import TimeoutError as FutureTimeoutError
+from typing import Callable, Dict, List, Any, Optional, Tuple, Union
 from openai import OpenAI
+from .metrics import record_tokens, track_tokens
+from .prompts import generation_messages
 from .analyze_code import CodeAnalyzer
+from .run_tests import TestRunner
+from .cache import LRUCache
+from .fingerprint import canonical_fingerprint
+from .units import extract_units, match_unit
 from dotenv import load_dotenv
 
 load_dotenv()
 
 class TestGenerator: 
     """Generates test cases based on code analysis using OpenAI API."""
+
+    # Number of users whose last submission is kept for incremental regeneration
+    UNIT_CACHE_SIZE = 1024
+    # Number of distinct (normalized) code snippets whose analysis and tests are kept
+    RESULT_CACHE_SIZE = 4096
+    # Seconds a prefetched detection/analysis result stays usable
+    PREFETCH_TTL = 300
+    # Seconds a prefetch waits before calling OpenAI, so a burst of drafts costs one analysis
+    PREFETCH_DEBOUNCE = 0.5
+    # Seconds /generate-tests waits for an in-flight prefetch of the same code
+    PREFETCH_WAIT = 60
     
     def __init__(self, api_key: Optional[str] = None):
         """
@@ -23,87 +45,329 @@ class TestGenerator:
         
         self.client = OpenAI(api_key=self.api_key)
         self.analyzer = CodeAnalyzer(api_key=self.api_key)
+        self.runner = TestRunner()
+        self._unit_cache = LRUCache(self.UNIT_CACHE_SIZE)
+        self._result_cache = LRUCache(self.RESULT_CACHE_SIZE)
+        self._prefetch_cache = LRUCache(self.UNIT_CACHE_SIZE, ttl=self.PREFETCH_TTL)
+        self._prefetch_jobs: Dict[str, Tuple[str, Future]] = {}
+        self._prefetch_lock = threading.Lock()
+        self._prefetch_executor = ThreadPoolExecutor(max_workers=4, thread_name_prefix="prefetch")
 
     
-    def generate_tests(self, code: str) -> Dict[str, Any]:
+    def generate_tests(self, code: str, verify: bool = False, user_id: Optional[str] = None) -> Dict[str, Any]:
         """
         Generate test cases based on code analysis. (Wrapper function)
         
         Args:
             code: The source code to analyze and generate tests for
+            verify: If True, run the generated test cases against the code and attach their status
+            user_id: If given, tests for functions and classes unchanged since this user's
+                previous submission are reused and only changed units are regenerated
             
         Returns:
             Dictionary containing test objects with test types and test cases
         """
-        # First, analyze the code to understand its structure
-        analysis = self.analyzer._analyze_with_openai(code)
-        
-        if "error" in analysis:
-            return {"error": f"Analysis failed: {analysis['error']}"}
-        
-        # Detect the language of the original code
-        language = self.analyzer._detect_language_with_gpt(code)
-        
+        tests, language = self._generate_incrementally(code, user_id) if user_id else (None, None)
+        if tests is not None and "error" in tests:
+            return tests
+
+        if tests is None:
+            tests, language = self._analyze_and_generate(code, user_id=user_id)
+            if "error" in tests:
+                return tests
+
+            units, _ = extract_units(code, language)
+            tests["incremental"] = {"reused_units": 0, "regenerated_units": list(units)}
+
+        if user_id:
+            self._remember_units(user_id, code, language, tests)
+
+        # Recorded so exported suites can be rendered for the right test framework
+        tests["language"] = language
+
+        # Optionally execute the generated cases in the sandbox
+        if verify:
+            tests["verification"] = self.runner.verify(code, language, tests)
+
+        return tests
+
+    def _plan_incremental(self, code: str, user_id: str) -> Optional[Dict[str, Any]]:
+        """
+        Work out which units changed since the user's previous submission.
+
+        Returns:
+            Dictionary with the previous submission, the language, the units, the names of
+            unchanged and changed units and the code to analyze for the changed units (None
+            if nothing changed), or None if the full suite must be generated
+        """
+        previous = self._unit_cache.get(user_id)
+        if previous is None:
+            return None
+
+        language = previous["language"]
+        units, residue = extract_units(code, language)
+        previous_units = previous["units"]
+
+        # Imports and top-level statements can affect every unit, so any change there
+        # (or a completely different file) requires a full regeneration
+        unchanged = [name for name, source in units.items()
+                     if name in previous_units and previous_units[name]["fingerprint"] == canonical_fingerprint(source)]
+        if canonical_fingerprint(residue) != previous["residue"] or not unchanged:
+            return None
+
+        changed = [name for name in units if name not in unchanged]
+        removed = [name for name in previous_units if name not in units]
+        # Suites that could not be attributed to a unit (e.g. a method-level target such as
+        # "add" for class C) may test any of them, so they are only reused if nothing changed
+        if previous["module_suites"] and (changed or removed):
+            return None
+
+        changed_code = residue.strip() + "\n\n" + "\n\n".join(units[name] for name in changed) if changed else None
+        return {
+            "previous": previous,
+            "language": language,
+            "units": units,
+            "unchanged": unchanged,
+            "changed": changed,
+            "changed_code": changed_code
+        }
+
+    def _generate_incrementally(self, code: str, user_id: str) -> Tuple[Optional[Dict[str, Any]], Optional[str]]:
+        """
+        Regenerate tests only for the units that changed since the user's previous submission.
+
+        Returns:
+            Tuple of (tests, language), or (None, None) if the submission cannot be
+            handled incrementally and the full suite must be generated
+        """
+        plan = self._plan_incremental(code, user_id)
+        if plan is None:
+            return None, None
+
+        previous, language, units = plan["previous"], plan["language"], plan["units"]
+        unchanged, changed = plan["unchanged"], plan["changed"]
+        previous_units = previous["units"]
+        suites_by_unit = {name: copy.deepcopy(previous_units[name]["suites"]) for name in unchanged}
+        module_suites = copy.deepcopy(previous["module_suites"])
+        test_framework = previous["test_framework"]
+        setup_instructions = previous["setup_instructions"]
+
+        if changed:
+            fresh, _ = self._analyze_and_generate(plan["changed_code"], language, user_id=user_id)
+            if "error" in fresh:
+                return fresh, language
+
+            for suite in fresh.get("test_suite", []):
+                name = match_unit(suite, changed)
+                if name is None:
+                    module_suites.append(suite)
+                else:
+                    suites_by_unit.setdefault(name, []).append(suite)
+            test_framework = fresh.get("test_framework", test_framework)
+            setup_instructions = fresh.get("setup_instructions", setup_instructions)
+
+        test_suite = [suite for name in units for suite in suites_by_unit.get(name, [])] + module_suites
+        tests = {
+            "test_suite": test_suite,
+            "test_framework": test_framework,
+            "setup_instructions": setup_instructions,
+            "incremental": {"reused_units": len(unchanged), "regenerated_units": changed}
+        }
+        return tests, language
+
+    def _remember_units(self, user_id: str, code: str, language: str, tests: Dict[str, Any]) -> None:
+        """Store the per-unit fingerprints and test suites of a user's latest submission."""
+        units, residue = extract_units(code, language)
+        names = list(units)
+        cached_units = {name: {"fingerprint": canonical_fingerprint(source), "suites": []} for name, source in units.items()}
+        module_suites = []
+
+        for suite in copy.deepcopy(tests.get("test_suite", [])):
+            name = match_unit(suite, names)
+            if name is None:
+                module_suites.append(suite)
+            else:
+                cached_units[name]["suites"].append(suite)
+
+        self._unit_cache.put(user_id, {
+            "language": language,
+            "residue": canonical_fingerprint(residue),
+            "units": cached_units,
+            "module_suites": module_suites,
+            "test_framework": tests.get("test_framework"),
+            "setup_instructions": tests.get("setup_instructions")
+        })
+
+    def prefetch(
+        self,
+        code: str,
+        user_id: str,
+        on_usage: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Dict[str, Any]:
+        """
+        Start language detection and analysis of a draft in the background.
+
+        The analysis prefetched is the one a later generate_tests call for the draft will
+        need: for a user whose previous submission is cached, only the changed units (in
+        the known language), otherwise the whole draft. It is kept per user under the
+        canonical fingerprint of the analyzed code for PREFETCH_TTL seconds. A newer draft
+        from the same user supersedes an older one: a job that has not started is
+        cancelled, and a running job stops before its next OpenAI call.
+
+        Args:
+            code: The draft code being edited
+            user_id: The user editing the draft
+            on_usage: Called from the background job with its token usage (as collected by
+                track_tokens) once it has made at least one OpenAI call. The job runs on a
+                worker thread, outside the caller's track_tokens block.
+
+        Returns:
+            Dictionary with the fingerprint of the code to analyze and a status of
+            "cached", "pending" or "scheduled"
+        """
+        plan = self._plan_incremental(code, user_id)
+        language = None
+        if plan is not None:
+            if plan["changed_code"] is None:
+                # Every unit's tests will be reused; there is nothing to analyze
+                return {"status": "cached", "fingerprint": None}
+            code, language = plan["changed_code"], plan["language"]
+
+        key = canonical_fingerprint(code)
+        if key in self._result_cache or (user_id, key) in self._prefetch_cache:
+            return {"status": "cached", "fingerprint": key}
+
+        with self._prefetch_lock:
+            current = self._prefetch_jobs.get(user_id)
+            if current is not None and current[0] == key:
+                return {"status": "pending", "fingerprint": key}
+            if current is not None:
+                current[1].cancel()
+            future = self._prefetch_executor.submit(self._run_prefetch, code, key, user_id, language, on_usage)
+            self._prefetch_jobs[user_id] = (key, future)
+        return {"status": "scheduled", "fingerprint": key}
+
+    def _is_current_prefetch(self, user_id: str, key: str) -> bool:
+        job = self._prefetch_jobs.get(user_id)
+        return job is not None and job[0] == key
+
+    def _run_prefetch(
+        self,
+        code: str,
+        key: str,
+        user_id: str,
+        language: Optional[str] = None,
+        on_usage: Optional[Callable[[Dict[str, Any]], None]] = None
+    ) -> Optional[Dict[str, Any]]:
+        """Background job: detect (unless known) and analyze a draft unless a newer draft replaces it."""
+        usage = None
+        try:
+            with track_tokens() as usage:
+                time.sleep(self.PREFETCH_DEBOUNCE)
+                if not self._is_current_prefetch(user_id, key):
+                    return None
+                if language is None:
+                    language = self.analyzer._detect_language_with_gpt(code)
+                    if not self._is_current_prefetch(user_id, key):
+                        return None
+                analysis = self.analyzer._analyze_with_openai(code, language=language)
+                if "error" in analysis:
+                    return None
+                entry = {"language": language, "analysis": analysis}
+                self._prefetch_cache.put((user_id, key), entry)
+                return entry
+        finally:
+            with self._prefetch_lock:
+                if self._is_current_prefetch(user_id, key):
+                    del self._prefetch_jobs[user_id]
+            # Superseded or unused prefetches still cost tokens, so they are always reported
+            if on_usage is not None and usage is not None and usage["calls"]:
+                on_usage(usage)
+
+    def _get_prefetched(self, user_id: str, key: str) -> Optional[Dict[str, Any]]:
+        """
+        Return a prefetched analysis, waiting for a matching prefetch that is already running.
+
+        A matching job still queued behind other users' jobs is cancelled instead, so the
+        caller computes the analysis itself rather than blocking until a worker frees up.
+        """
+        entry = self._prefetch_cache.pop((user_id, key))
+        if entry is not None:
+            return entry
+        with self._prefetch_lock:
+            job = self._prefetch_jobs.get(user_id)
+            if job is not None and job[0] == key and job[1].cancel():
+                # A cancelled job never runs, so it cannot remove itself
+                del self._prefetch_jobs[user_id]
+                return None
+        if job is None or job[0] != key:
+            # The job may have finished between the cache lookup and now
+            return self._prefetch_cache.pop((user_id, key))
+        try:
+            entry = job[1].result(timeout=self.PREFETCH_WAIT)
+        except (CancelledError, FutureTimeoutError):
+            return None
+        self._prefetch_cache.pop((user_id, key))
+        return entry
+
+    def _analyze_and_generate(
+        self,
+        code: str,
+        language: Optional[str] = None,
+        user_id: Optional[str] = None
+    ) -> Tuple[Dict[str, Any], str]:
+        """
+        Run detection, analysis and generation for a snippet, reusing earlier results.
+
+        Results are cached by the canonical fingerprint of the code, so snippets that only
+        differ in formatting, comments, quote style or local names are served without any
+        OpenAI calls. Detection and analysis prefetched for the user are reused as well.
+
+        Returns:
+            Tuple of (tests, language)
+        """
+        key = canonical_fingerprint(code)
+        cached = self._result_cache.get(key)
+        if cached is not None and language in (None, cached["language"]):
+            return copy.deepcopy(cached["tests"]), cached["language"]
+
+        prefetched = self._get_prefetched(user_id, key) if user_id else None
+        if prefetched is not None and language in (None, prefetched["language"]):
+            language = prefetched["language"]
+            analysis = prefetched["analysis"]
+        else:
+            # Detect the language of the original code
+            if language is None:
+                language = self.analyzer._detect_language_with_gpt(code)
+
+            # Analyze the code to understand its structure
+            analysis = self.analyzer._analyze_with_openai(code, language=language)
+            if "error" in analysis:
+                return {"error": f"Analysis failed: {analysis['error']}"}, language
+
         # Generate tests based on the analysis
-        return self._generate_test_cases(analysis, language, code)
+        tests = self._generate_test_cases(analysis, language, code)
+        if "error" not in tests:
+            self._result_cache.put(key, {
+                "language": language,
+                "analysis": analysis,
+                "tests": copy.deepcopy(tests)
+            })
+        return tests, language
     
 
     def _generate_test_cases(self, analysis: Dict[str, Any], language: str, original_code: str) -> Dict[str, Any]:
         """Generate test cases using OpenAI based on the code analysis."""
         
-        # Create a prompt for test generation
-        prompt = f"""
-        Based on the following code analysis, generate comprehensive test cases in {language}.
-        
-        Code Analysis:
-        {json.dumps(analysis, indent=2)}
-        
-        Original Code:
-        {original_code}
-        
-        Generate test cases that include:
-        1. Unit tests for each function and method
-        2. Integration tests for classes and complex interactions
-        3. Edge cases and error conditions
-        4. Tests for different input scenarios
-        
-        CRITICAL: You must respond with ONLY valid JSON. Do not include any explanatory text before or after the JSON.
-        
-        Use this exact JSON structure:
-        {{
-            "test_suite": [
-                {{
-                    "test_type": "unit_test",
-                    "target": "function_name",
-                    "description": "what this test is testing",
-                    "test_cases": [
-                        {{
-                            "name": "test_case_name",
-                            "description": "what this specific test case does",
-                            "input": "input_data_or_parameters",
-                            "expected_output": "expected_result",
-                            "test_code": "actual test code in {language}"
-                        }}
-                    ]
-                }}
-            ],
-            "test_framework": "appropriate testing framework for {language}",
-            "setup_instructions": "how to set up the testing environment"
-        }}
-        
-        Make sure the test code is written in {language} and uses appropriate testing conventions for that language.
-        """
-        
         try:
+            started = time.perf_counter()
             response = self.client.chat.completions.create(
                 model="gpt-4",
-                messages=[
-                    {"role": "system", "content": f"You are a testing expert specializing in {language}. Generate comprehensive, well-structured test cases that follow best practices for {language} testing. IMPORTANT: You must respond with valid JSON only."},
-                    {"role": "user", "content": prompt}
-                ],
+                messages=generation_messages(analysis, language, original_code),
                 temperature=0.2,
                 max_tokens=4000
             )
+            record_tokens(response, "generation", (time.perf_counter() - started) * 1000)
             
             # Parse the JSON response
             test_text = response.choices[0].message.content.strip()
@@ -0,0 +1,92 @@
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+from .prompts import PROMPT_VERSION
+
+
+_current_usage: ContextVar[Optional[Dict[str, Any]]] = ContextVar("token_usage", default=None)
+_totals_lock = threading.Lock()
+
+# Process-wide counters per stage ("detection", "analysis", "generation")
+TOTALS: Dict[str, Dict[str, Any]] = {}
+
+
+def _empty_usage() -> Dict[str, Any]:
+    return {
+        "calls": 0,
+        "prompt_tokens": 0,
+        "cached_tokens": 0,
+        "completion_tokens": 0,
+        "total_tokens": 0,
+        "cached_calls": 0,
+        "latency_ms_cached": 0.0,
+        "latency_ms_uncached": 0.0
+    }
+
+
+@contextmanager
+def track_tokens() -> Iterator[Dict[str, Any]]:
+    """
+    Collect the token usage of all OpenAI calls made inside the block.
+
+    Yields:
+        Dictionary with calls, prompt_tokens, cached_tokens, completion_tokens and
+        total_tokens, filled in as calls complete
+    """
+    usage = _empty_usage()
+    token = _current_usage.set(usage)
+    try:
+        yield usage
+    finally:
+        _current_usage.reset(token)
+
+
+def record_tokens(response, stage: str, latency_ms: float = 0.0) -> None:
+    """Add the usage reported on an OpenAI chat completion to the active trackers."""
+    usage = getattr(response, "usage", None)
+    if usage is None:
+        return
+    # Tokens served from the provider's prompt cache
+    details = getattr(usage, "prompt_tokens_details", None)
+    cached_tokens = getattr(details, "cached_tokens", 0) or 0
+    counts = {
+        "calls": 1,
+        "prompt_tokens": getattr(usage, "prompt_tokens", 0) or 0,
+        "cached_tokens": cached_tokens,
+        "completion_tokens": getattr(usage, "completion_tokens", 0) or 0,
+        "total_tokens": getattr(usage, "total_tokens", 0) or 0,
+        "cached_calls": 1 if cached_tokens else 0,
+        "latency_ms_cached": latency_ms if cached_tokens else 0.0,
+        "latency_ms_uncached": 0.0 if cached_tokens else latency_ms
+    }
+
+    current = _current_usage.get()
+    if current is not None:
+        for key, value in counts.items():
+            current[key] = current.get(key, 0) + value
+
+    with _totals_lock:
+        totals = TOTALS.setdefault(stage, _empty_usage())
+        for key, value in counts.items():
+            totals[key] = totals.get(key, 0) + value
+
+
+def token_metrics() -> Dict[str, Any]:
+    """
+    Summarize token usage and prompt cache effectiveness per stage since startup.
+
+    Returns:
+        Dictionary with the prompt template version and, per stage, the raw counters plus
+        the share of prompt tokens served from cache and average latency with and without
+        a cache hit
+    """
+    with _totals_lock:
+        stages = {stage: dict(counts) for stage, counts in TOTALS.items()}
+
+    for counts in stages.values():
+        uncached_calls = counts["calls"] - counts["cached_calls"]
+        counts["cached_token_rate"] = counts["cached_tokens"] / counts["prompt_tokens"] if counts["prompt_tokens"] else 0
+        counts["avg_latency_ms_cached"] = counts["latency_ms_cached"] / counts["cached_calls"] if counts["cached_calls"] else 0
+        counts["avg_latency_ms_uncached"] = counts["latency_ms_uncached"] / uncached_calls if uncached_calls else 0
+    return {"prompt_version": PROMPT_VERSION, "stages": stages}
@@ -0,0 +1,155 @@
+"""
+Versioned prompt templates for language detection, code analysis and test generation.
+
+Each prompt is split into a static prefix (role, instructions and the JSON response
+structure), which is byte-for-byte identical across requests, and a variable suffix
+(language, analysis and the user's code).
+
+This layout does not by itself produce cache hits. OpenAI only caches prompt prefixes
+of 1024 tokens or more, and only on models that support prompt caching. These system
+prompts are well below that (roughly 80 to 450 tokens) and are sent to gpt-4, so
+`cached_tokens` in the metrics stays 0 for now. The split keeps the prefix stable so
+caching can take effect once the static part crosses the threshold on a supported
+model. The metrics will show when that happens.
+
+Bump PROMPT_VERSION whenever a template changes so token and cache metrics can be
+attributed to the template revision that produced them.
+"""
+import json
+from typing import Dict, List, Any
+
+
+PROMPT_VERSION = "2"
+
+VALID_LANGUAGES = {
+    'python', 'javascript', 'typescript', 'java', 'cpp', 'c', 'csharp',
+    'go', 'rust', 'php', 'ruby', 'swift', 'kotlin', 'jsx', 'tsx'
+}
+
+
+LANGUAGE_DETECTION_SYSTEM = """You are a programming language detection expert. Return only the language name in lowercase.
+
+Analyze the code in the user message and determine the programming language.
+
+Return ONLY the language name in lowercase (e.g., 'python', 'javascript', 'typescript', 'java', 'cpp', 'c', 'csharp', 'go', 'rust', 'php', 'ruby', 'swift', 'kotlin').
+If you cannot determine the language, return 'unknown'."""
+
+
+ANALYSIS_SYSTEM = """You are a code analysis expert. Provide detailed, accurate analysis of code structure and functionality.
+
+Analyze the code in the user message, written in the language it names, and provide detailed information about:
+1. All functions and their parameters, return types, and purpose
+2. All classes, their methods, attributes, and inheritance
+3. Any complex logic or patterns used
+4. Potential issues or improvements
+
+Please provide your analysis in JSON format with the following structure:
+If the code does not use classes or certain structures or if analyzing a functional language, describe modules, main data structures, and key functions instead of classes.
+{
+    "functions": [
+        {
+            "name": "function_name",
+            "description": "what the function does",
+            "parameters": [
+                {
+                    "name": "param_name",
+                    "type": "param_type",
+                    "description": "what the parameter is for"
+                }
+            ],
+            "return_type": "return_type",
+            "return_description": "what the function returns",
+            "complexity": "simple/medium/complex"
+        }
+    ],
+    "classes": [
+        {
+            "name": "class_name",
+            "description": "what the class represents",
+            "methods": [
+                {
+                    "name": "method_name",
+                    "description": "what the method does",
+                    "parameters": [...],
+                    "return_type": "return_type",
+                    "return_description": "what the method returns"
+                }
+            ],
+            "attributes": [
+                {
+                    "name": "attr_name",
+                    "type": "attr_type",
+                    "description": "what the attribute stores"
+                }
+            ],
+            "inheritance": "base classes if any"
+        }
+    ],
+    "overall_complexity": "simple/medium/complex"
+}"""
+
+
+GENERATION_SYSTEM = """You are a testing expert. Generate comprehensive, well-structured test cases that follow best practices for testing in the language named in the user message. IMPORTANT: You must respond with valid JSON only.
+
+The user message contains a language, a code analysis and the original code. Generate comprehensive test cases in that language that include:
+1. Unit tests for each function and method
+2. Integration tests for classes and complex interactions
+3. Edge cases and error conditions
+4. Tests for different input scenarios
+
+CRITICAL: You must respond with ONLY valid JSON. Do not include any explanatory text before or after the JSON.
+
+Use this exact JSON structure:
+{
+    "test_suite": [
+        {
+            "test_type": "unit_test",
+            "target": "function_name",
+            "description": "what this test is testing",
+            "test_cases": [
+                {
+                    "name": "test_case_name",
+                    "description": "what this specific test case does",
+                    "input": "input_data_or_parameters",
+                    "expected_output": "expected_result",
+                    "test_code": "actual test code in the given language"
+                }
+            ]
+        }
+    ],
+    "test_framework": "appropriate testing framework for the given language",
+    "setup_instructions": "how to set up the testing environment"
+}
+
+Make sure the test code is written in the given language and uses appropriate testing conventions for that language."""
+
+
+def language_detection_messages(code: str) -> List[Dict[str, str]]:
+    """Chat messages asking for the language of a code snippet."""
+    return [
+        {"role": "system", "content": LANGUAGE_DETECTION_SYSTEM},
+        {"role": "user", "content": f"Code:\n{code}"}
+    ]
+
+
+def analysis_messages(code: str, language: str) -> List[Dict[str, str]]:
+    """Chat messages asking for a structural analysis of a code snippet."""
+    return [
+        {"role": "system", "content": ANALYSIS_SYSTEM},
+        {"role": "user", "content": f"Language: {language}\n\nCode:\n{code}"}
+    ]
+
+
+def generation_messages(analysis: Dict[str, Any], language: str, original_code: str) -> List[Dict[str, str]]:
+    """Chat messages asking for a test suite based on a code analysis."""
+    return [
+        {"role": "system", "content": GENERATION_SYSTEM},
+        {
+            "role": "user",
+            "content": (
+                f"Language: {language}\n\n"
+                f"Code Analysis:\n{json.dumps(analysis, indent=2)}\n\n"
+                f"Original Code:\n{original_code}"
+            )
+        }
+    ]
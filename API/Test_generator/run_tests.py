@@ -0,0 +1,586 @@
+import os
+import sys
+import json
+import time
+import ctypes
+import signal
+import shutil
+import tempfile
+import threading
+import subprocess
+import multiprocessing
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Any, Optional, Tuple
+
+try:
+    import pwd
+    import resource
+except ImportError:  # Not available on Windows, where the sandbox is unsupported
+    pwd = resource = None
+
+
+# Minimal Jest-style globals so generated `expect(...)` snippets run under plain node.
+_JEST_SHIM = r"""
+const __deepEqual = (a, b) => {
+  if (Object.is(a, b)) return true;
+  if (typeof a !== 'object' || typeof b !== 'object' || a === null || b === null) return false;
+  const ka = Object.keys(a), kb = Object.keys(b);
+  return ka.length === kb.length && ka.every(k => __deepEqual(a[k], b[k]));
+};
+class __AssertionError extends Error {}
+const __matchers = (actual, negate) => {
+  const check = (ok, message) => {
+    if (ok === negate) throw new __AssertionError((negate ? 'not ' : '') + message);
+  };
+  return {
+    toBe: e => check(Object.is(actual, e), `expected ${String(actual)} to be ${String(e)}`),
+    toEqual: e => check(__deepEqual(actual, e), `expected ${JSON.stringify(actual)} to equal ${JSON.stringify(e)}`),
+    toStrictEqual: e => check(__deepEqual(actual, e), `expected ${JSON.stringify(actual)} to equal ${JSON.stringify(e)}`),
+    toBeTruthy: () => check(!!actual, `expected ${String(actual)} to be truthy`),
+    toBeFalsy: () => check(!actual, `expected ${String(actual)} to be falsy`),
+    toBeNull: () => check(actual === null, `expected ${String(actual)} to be null`),
+    toBeUndefined: () => check(actual === undefined, `expected ${String(actual)} to be undefined`),
+    toBeDefined: () => check(actual !== undefined, `expected value to be defined`),
+    toBeNaN: () => check(Number.isNaN(actual), `expected ${String(actual)} to be NaN`),
+    toBeGreaterThan: e => check(actual > e, `expected ${actual} > ${e}`),
+    toBeGreaterThanOrEqual: e => check(actual >= e, `expected ${actual} >= ${e}`),
+    toBeLessThan: e => check(actual < e, `expected ${actual} < ${e}`),
+    toBeLessThanOrEqual: e => check(actual <= e, `expected ${actual} <= ${e}`),
+    toBeCloseTo: (e, d = 2) => check(Math.abs(actual - e) < Math.pow(10, -d) / 2, `expected ${actual} to be close to ${e}`),
+    toContain: e => check(actual.includes(e), `expected ${JSON.stringify(actual)} to contain ${JSON.stringify(e)}`),
+    toHaveLength: e => check(actual.length === e, `expected length ${actual.length} to be ${e}`),
+    toThrow: () => {
+      let threw = false;
+      try { actual(); } catch (err) { threw = true; }
+      check(threw, 'expected function to throw');
+    },
+  };
+};
+globalThis.expect = actual => Object.assign(__matchers(actual, false), { not: __matchers(actual, true) });
+const __queue = [];
+globalThis.test = globalThis.it = (name, fn) => __queue.push(fn);
+globalThis.describe = (name, fn) => fn();
+globalThis.beforeEach = globalThis.afterEach = globalThis.beforeAll = globalThis.afterAll = () => {};
+(async () => {
+  try {
+    await __body();
+    for (const fn of __queue) await fn();
+    process.stdout.write(JSON.stringify({ status: 'passed', detail: '' }));
+  } catch (err) {
+    const failed = err instanceof __AssertionError || (err && err.name === 'AssertionError');
+    process.stdout.write(JSON.stringify({ status: failed ? 'failed' : 'error', detail: String(err && err.stack || err) }));
+  }
+})();
+"""
+
+
+# Environment of sandboxed test processes. Nothing from the server's environment (API keys,
+# database credentials) is passed on.
+SANDBOX_ENV = {
+    "PATH": "/usr/local/bin:/usr/bin:/bin",
+    "HOME": "/tmp",
+    "LANG": "C.UTF-8",
+    "PYTHONDONTWRITEBYTECODE": "1"
+}
+
+# Unprivileged user test processes run as when the server runs as root
+SANDBOX_USER = "nobody"
+
+_PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+# Linux constants for unshare(2), mount(2), mount_setattr(2) and prctl(2)
+_CLONE_NEWNS = 0x00020000
+_CLONE_NEWIPC = 0x08000000
+_CLONE_NEWUSER = 0x10000000
+_CLONE_NEWPID = 0x20000000
+_CLONE_NEWNET = 0x40000000
+_MS_NOSUID, _MS_NODEV, _MS_NOEXEC = 2, 4, 8
+_MS_BIND, _MS_REC, _MS_PRIVATE = 4096, 16384, 1 << 18
+_SYS_MOUNT_SETATTR = 442
+_AT_FDCWD, _AT_RECURSIVE, _MOUNT_ATTR_RDONLY = -100, 0x8000, 1
+_PR_SET_DUMPABLE, _PR_SET_NO_NEW_PRIVS = 4, 38
+
+_FORKSERVER_LOCK = threading.Lock()
+
+
+class SandboxError(OSError):
+    """Raised when a test process cannot be isolated from the host."""
+
+
+class _MountAttr(ctypes.Structure):
+    _fields_ = [("attr_set", ctypes.c_uint64), ("attr_clr", ctypes.c_uint64),
+                ("propagation", ctypes.c_uint64), ("userns_fd", ctypes.c_uint64)]
+
+
+def _libc_call(name: str, *args) -> None:
+    if not sys.platform.startswith("linux"):
+        raise SandboxError(f"{name} requires Linux")
+    function = getattr(ctypes.CDLL(None, use_errno=True), name)
+    if function(*args) != 0:
+        errno = ctypes.get_errno()
+        raise SandboxError(errno, f"{name} failed: {os.strerror(errno)}")
+
+
+def _unshare(flags: int) -> None:
+    _libc_call("unshare", ctypes.c_int(flags))
+
+
+def _mount(source: Optional[str], target: str, fstype: Optional[str], flags: int = 0, data: Optional[str] = None) -> None:
+    encode = lambda value: value.encode() if value is not None else None
+    _libc_call("mount", encode(source), encode(target), encode(fstype), ctypes.c_ulong(flags), encode(data))
+
+
+def _prctl(option: int, value: int) -> None:
+    _libc_call("prctl", ctypes.c_int(option), ctypes.c_ulong(value), ctypes.c_ulong(0), ctypes.c_ulong(0), ctypes.c_ulong(0))
+
+
+def _make_readonly(path: str) -> None:
+    """Make `path` and every mount below it read-only."""
+    attr = _MountAttr(attr_set=_MOUNT_ATTR_RDONLY)
+    _libc_call(
+        "syscall", ctypes.c_long(_SYS_MOUNT_SETATTR), ctypes.c_int(_AT_FDCWD), path.encode(),
+        ctypes.c_uint(_AT_RECURSIVE), ctypes.byref(attr), ctypes.c_size_t(ctypes.sizeof(attr))
+    )
+
+
+def _map_ids(uid: int, gid: int) -> None:
+    """Map the current user and group onto themselves in a freshly unshared user namespace."""
+    with open("/proc/self/setgroups", "w") as f:
+        f.write("deny")
+    with open("/proc/self/uid_map", "w") as f:
+        f.write(f"{uid} {uid} 1")
+    with open("/proc/self/gid_map", "w") as f:
+        f.write(f"{gid} {gid} 1")
+
+
+def _is_within(path: str, directory: str) -> bool:
+    return path == directory or path.startswith(directory.rstrip("/") + "/")
+
+
+def _hide_paths(hidden_paths: List[str], keep_paths: List[str]) -> None:
+    """
+    Cover each hidden directory with an empty tmpfs.
+
+    Directories that must stay reachable inside a hidden one, such as a Python or node
+    installation under the home directory, are bind-mounted back at their original path.
+    """
+    staged = []
+    for index, keep in enumerate(keep_paths):
+        stage = f"/tmp/.keep/{index}"
+        os.makedirs(stage)
+        _mount(keep, stage, None, _MS_BIND | _MS_REC)
+        staged.append((keep, stage))
+
+    for hidden in hidden_paths:
+        _mount("tmpfs", hidden, "tmpfs", _MS_NOSUID | _MS_NODEV, "mode=755,size=1m")
+        for keep, stage in staged:
+            if _is_within(keep, hidden):
+                os.makedirs(keep, exist_ok=True)
+                _mount(stage, keep, None, _MS_BIND | _MS_REC)
+
+
+def _apply_limits(cpu_seconds: int, memory_bytes: Optional[int], max_processes: int) -> None:
+    """Apply CPU, address-space and process limits to the current (sandboxed) process."""
+    resource.setrlimit(resource.RLIMIT_CPU, (cpu_seconds, cpu_seconds))
+    if memory_bytes:
+        resource.setrlimit(resource.RLIMIT_AS, (memory_bytes, memory_bytes))
+    resource.setrlimit(resource.RLIMIT_NPROC, (max_processes, max_processes))
+    resource.setrlimit(resource.RLIMIT_CORE, (0, 0))
+
+
+def _enter_sandbox(limits: Dict[str, Any]) -> str:
+    """
+    Isolate the current process, which must be init of a new PID namespace.
+
+    The root filesystem is made read-only, /proc only shows the sandbox, /tmp is a private
+    tmpfs and the application, server working directory and home directory are hidden.
+    The process then drops to an unprivileged user in a nested user namespace, which locks
+    these mounts so they cannot be undone.
+
+    Returns:
+        Path of the writable working directory for the test case
+    """
+    _mount(None, "/", None, _MS_REC | _MS_PRIVATE)
+    _make_readonly("/")
+    _mount("proc", "/proc", "proc", _MS_NOSUID | _MS_NODEV | _MS_NOEXEC)
+    size_mb = max(limits["memory_bytes"] or 0, 64 * 1024 * 1024) // (1024 * 1024)
+    _mount("tmpfs", "/tmp", "tmpfs", _MS_NOSUID | _MS_NODEV, f"mode=1777,size={size_mb}m")
+    _hide_paths(limits["hidden_paths"], limits["keep_paths"])
+
+    if os.geteuid() == 0:
+        user = pwd.getpwnam(SANDBOX_USER)
+        os.setgroups([])
+        os.setgid(user.pw_gid)
+        os.setuid(user.pw_uid)
+        # Changing user clears the dumpable flag, which makes /proc/self root-owned
+        _prctl(_PR_SET_DUMPABLE, 1)
+    uid, gid = os.getuid(), os.getgid()
+    _unshare(_CLONE_NEWUSER | _CLONE_NEWNS)
+    _map_ids(uid, gid)
+    _prctl(_PR_SET_NO_NEW_PRIVS, 1)
+
+    # The environment a process was started with stays readable in /proc/self/environ,
+    # so refuse to run if the forkserver was not started with the scrubbed environment
+    with open("/proc/self/environ", "rb") as f:
+        leaked = {entry.split(b"=", 1)[0].decode() for entry in f.read().split(b"\0") if entry} - set(SANDBOX_ENV)
+    if leaked:
+        raise SandboxError(f"Server environment is visible to the sandbox: {', '.join(sorted(leaked))}")
+    os.environ.clear()
+    os.environ.update(SANDBOX_ENV)
+
+    workdir = tempfile.mkdtemp(prefix="testmate-", dir="/tmp")
+    os.chdir(workdir)
+    return workdir
+
+
+def _execute_javascript_case(code: str, test_code: str, node_path: str, memory_bytes: Optional[int], timeout: float) -> Tuple[str, str]:
+    """Run a JavaScript test case with node and a minimal Jest-compatible shim."""
+    script = f"const __body = async () => {{\n{code}\n;\n{test_code}\n}};\n{_JEST_SHIM}"
+    with open("test_solution.js", "w", encoding="utf-8") as f:
+        f.write(script)
+
+    memory_mb = str(memory_bytes // (1024 * 1024)) if memory_bytes else "256"
+    try:
+        completed = subprocess.run(
+            [node_path, f"--max-old-space-size={memory_mb}", "test_solution.js"],
+            env=SANDBOX_ENV,
+            capture_output=True,
+            text=True,
+            timeout=timeout
+        )
+    except subprocess.TimeoutExpired:
+        return "error", f"Timed out after {timeout} seconds"
+    try:
+        outcome = json.loads(completed.stdout.strip().splitlines()[-1])
+        return outcome["status"], outcome.get("detail", "")
+    except (json.JSONDecodeError, IndexError, KeyError):
+        return "error", completed.stderr or completed.stdout
+
+
+def _execute_python_case(code: str, test_code: str) -> Tuple[str, str]:
+    """
+    Execute a single generated test case against the submitted code.
+
+    The submitted code is loaded as a module named `solution` so tests can either
+    use its names directly or import it. Any `test*` functions and unittest.TestCase
+    subclasses defined by the test code are run after it is executed.
+    """
+    import types
+    import unittest
+    import traceback
+
+    module = types.ModuleType("solution")
+    module.__file__ = "solution.py"
+    sys.modules["solution"] = module
+    try:
+        exec(compile(code, "solution.py", "exec"), module.__dict__)
+    except Exception:
+        return "error", "Submitted code failed to load:\n" + traceback.format_exc(limit=3)
+
+    namespace = dict(module.__dict__)
+    namespace["__name__"] = "test_solution"
+    try:
+        exec(compile(test_code, "test_solution.py", "exec"), namespace)
+
+        test_functions = [
+            obj for name, obj in namespace.items()
+            if name.startswith("test") and callable(obj) and not isinstance(obj, type)
+            and module.__dict__.get(name) is not obj
+        ]
+        for test_function in test_functions:
+            test_function()
+
+        test_classes = [
+            obj for obj in namespace.values()
+            if isinstance(obj, type) and issubclass(obj, unittest.TestCase) and obj is not unittest.TestCase
+        ]
+        if test_classes:
+            loader = unittest.TestLoader()
+            suite = unittest.TestSuite(loader.loadTestsFromTestCase(cls) for cls in test_classes)
+            result = unittest.TestResult()
+            suite.run(result)
+            if result.errors:
+                return "error", result.errors[0][1]
+            if result.failures:
+                return "failed", result.failures[0][1]
+    except AssertionError:
+        return "failed", traceback.format_exc(limit=3)
+    except Exception:
+        return "error", traceback.format_exc(limit=3)
+    return "passed", ""
+
+
+def _sandboxed_case(conn, language: str, code: str, test_code: str, limits: Dict[str, Any]) -> None:
+    """Body of the sandbox: isolate, run one test case and report its outcome over `conn`."""
+    try:
+        _enter_sandbox(limits)
+    except (OSError, KeyError) as e:
+        conn.send(("skipped", f"Sandbox isolation is unavailable on this host: {e}"))
+        return
+
+    if language == "python":
+        _apply_limits(limits["cpu_seconds"], limits["memory_bytes"], limits["max_processes"])
+        devnull = open(os.devnull, "w")
+        sys.stdout = sys.stderr = devnull
+        try:
+            status, detail = _execute_python_case(code, test_code)
+        except MemoryError:
+            status, detail = "error", "Memory limit exceeded"
+        except BaseException as e:
+            status, detail = "error", f"{type(e).__name__}: {e}"
+    else:
+        # V8 reserves far more address space than it uses, so node's memory is capped
+        # through its heap limit rather than RLIMIT_AS
+        _apply_limits(limits["cpu_seconds"], None, limits["max_processes"])
+        status, detail = _execute_javascript_case(code, test_code, limits["node_path"], limits["memory_bytes"], limits["timeout"])
+    conn.send((status, detail[-2000:]))
+
+
+def _sandbox_worker(conn, language: str, code: str, test_code: str, limits: Dict[str, Any]) -> None:
+    """
+    Entry point of a child forked from the warm forkserver.
+
+    The child starts a new session, so the parent can kill everything it spawned as one
+    process group, and unshares network, mount, IPC and PID namespaces (plus a user
+    namespace when not running as root). The test case itself runs in a grandchild that
+    is init of the new PID namespace: when it exits, every process it left behind is killed.
+    """
+    try:
+        os.setsid()
+        flags = _CLONE_NEWNS | _CLONE_NEWNET | _CLONE_NEWIPC | _CLONE_NEWPID
+        if os.geteuid() != 0:
+            uid, gid = os.getuid(), os.getgid()
+            _unshare(flags | _CLONE_NEWUSER)
+            _map_ids(uid, gid)
+        else:
+            _unshare(flags)
+    except OSError as e:
+        conn.send(("skipped", f"Sandbox isolation is unavailable on this host: {e}"))
+        conn.close()
+        return
+
+    pid = os.fork()
+    if pid == 0:
+        try:
+            _sandboxed_case(conn, language, code, test_code, limits)
+        finally:
+            os._exit(0)
+
+    conn.close()
+    _, status = os.waitpid(pid, 0)
+    code = os.waitstatus_to_exitcode(status)
+    os._exit(code if code >= 0 else 128 - code)
+
+
+def _forkserver_running() -> bool:
+    """Whether the forkserver has been started and has not exited since."""
+    from multiprocessing import forkserver
+    pid = forkserver._forkserver._forkserver_pid
+    if pid is None:
+        return False
+    try:
+        with open(f"/proc/{pid}/stat") as f:
+            return f.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except (OSError, IndexError):
+        return False
+
+
+def _start_forkserver() -> None:
+    """
+    Start the forkserver, unless it is running, with SANDBOX_ENV as its environment.
+
+    Sandboxed children inherit the forkserver's environment, so it must never be started
+    with the server's own. That means swapping the process-wide os.environ while the
+    forkserver is spawned, which is only safe before the server starts other threads:
+    call this once at startup (TestRunner.warm_up), never from a request.
+    """
+    from multiprocessing import forkserver
+    with _FORKSERVER_LOCK:
+        if _forkserver_running():
+            return
+        saved = os.environ.copy()
+        os.environ.clear()
+        os.environ.update(SANDBOX_ENV)
+        try:
+            forkserver.ensure_running()
+        finally:
+            os.environ.clear()
+            os.environ.update(saved)
+
+
+class TestRunner:
+    """Runs generated test cases against submitted code in sandboxed subprocesses."""
+
+    SUPPORTED_LANGUAGES = {"python", "javascript", "jsx"}
+
+    def __init__(
+        self,
+        timeout: float = 5.0,
+        cpu_seconds: int = 2,
+        memory_mb: int = 256,
+        max_workers: Optional[int] = None,
+        max_processes: int = 32,
+        hidden_paths: Optional[List[str]] = None
+    ):
+        """
+        Initialize the TestRunner.
+
+        Args:
+            timeout: Wall-clock limit in seconds for a single test case.
+            cpu_seconds: CPU time limit in seconds for a single test case.
+            memory_mb: Memory limit in megabytes for a single test case.
+            max_workers: Number of test cases run in parallel. Defaults to the CPU count.
+            max_processes: Limit on processes and threads inside a single test case's sandbox.
+            hidden_paths: Directories hidden from test cases. Defaults to the application
+                directory, the server's working directory and the home directory.
+        """
+        self.timeout = timeout
+        self.cpu_seconds = cpu_seconds
+        self.memory_bytes = memory_mb * 1024 * 1024 if memory_mb else None
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.max_processes = max_processes
+        self.node_path = shutil.which("node")
+        if self.node_path:
+            self.node_path = os.path.realpath(self.node_path)
+
+        if hidden_paths is None:
+            hidden_paths = [_PROJECT_ROOT, os.getcwd(), os.path.expanduser("~")]
+        hidden = sorted({os.path.realpath(path) for path in hidden_paths if os.path.isdir(path)})
+        # Nested directories are already covered by their parent; the root and /tmp never need hiding
+        self.hidden_paths = [
+            path for path in hidden
+            if path not in ("/", "/tmp") and not _is_within(path, "/tmp")
+            and not any(_is_within(path, other) for other in hidden if other != path)
+        ]
+        # Installations the sandbox needs even if they live inside a hidden directory
+        keep = {os.path.realpath(sys.prefix), os.path.realpath(sys.base_prefix)}
+        if self.node_path:
+            keep.add(os.path.dirname(os.path.dirname(self.node_path)))
+        self.keep_paths = sorted(path for path in keep if any(_is_within(path, h) for h in self.hidden_paths))
+
+        # Test cases are forked from a warm forkserver interpreter that already has this
+        # module imported, so starting a sandbox costs a fork rather than a full interpreter boot.
+        methods = multiprocessing.get_all_start_methods()
+        self._context = multiprocessing.get_context("forkserver" if "forkserver" in methods else "spawn")
+        if self._context.get_start_method() == "forkserver":
+            self._context.set_forkserver_preload([__name__, "unittest", "traceback"])
+
+    def warm_up(self) -> None:
+        """
+        Start the forkserver. Call once at startup, before serving requests: verification
+        does not start or restart it, and reports an error if it is not running.
+        """
+        if self._context.get_start_method() == "forkserver":
+            _start_forkserver()
+
+    def supports(self, language: str) -> bool:
+        """Return True if test cases in the given language can be executed locally."""
+        if language in ("javascript", "jsx"):
+            return self.node_path is not None
+        return language in self.SUPPORTED_LANGUAGES
+
+    def verify(self, code: str, language: str, tests: Dict[str, Any]) -> Dict[str, int]:
+        """
+        Run every test case in a generated suite and attach its outcome.
+
+        Each entry in `tests["test_suite"][*]["test_cases"]` gets a `verification`
+        dictionary with `status` (passed/failed/error/skipped), `detail` and `duration_ms`.
+
+        Args:
+            code: The submitted source code the tests target
+            language: Detected language of the code
+            tests: Test generation result, updated in place
+
+        Returns:
+            Dictionary with the number of test cases per status
+        """
+        cases = [
+            case
+            for suite in tests.get("test_suite", [])
+            for case in suite.get("test_cases", [])
+        ]
+        summary = {"passed": 0, "failed": 0, "error": 0, "skipped": 0}
+
+        if not self.supports(language):
+            for case in cases:
+                case["verification"] = {
+                    "status": "skipped",
+                    "detail": f"Execution is not supported for language '{language}'",
+                    "duration_ms": 0
+                }
+            summary["skipped"] = len(cases)
+            return summary
+
+        if self._context.get_start_method() == "forkserver" and not _forkserver_running():
+            # Restarting it here would expose the live server environment to other
+            # threads while it is swapped out; multiprocessing would restart it with
+            # the server's environment instead, which the sandbox refuses to run under
+            for case in cases:
+                case["verification"] = {
+                    "status": "error",
+                    "detail": "Sandbox is unavailable: the forkserver is not running",
+                    "duration_ms": 0
+                }
+            summary["error"] = len(cases)
+            return summary
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            outcomes = list(executor.map(lambda case: self._timed(language, code, case.get("test_code", "")), cases))
+
+        for case, outcome in zip(cases, outcomes):
+            case["verification"] = outcome
+            summary[outcome["status"]] += 1
+        return summary
+
+    def _timed(self, language: str, code: str, test_code: str) -> Dict[str, Any]:
+        """Run a single case and record its wall-clock duration."""
+        started = time.perf_counter()
+        if not test_code.strip():
+            status, detail = "skipped", "Test case has no test_code"
+        else:
+            try:
+                status, detail = self._run_case(language, code, test_code)
+            except Exception as e:
+                status, detail = "error", f"Test runner error: {str(e)}"
+        return {
+            "status": status,
+            "detail": detail,
+            "duration_ms": round((time.perf_counter() - started) * 1000, 2)
+        }
+
+    def _run_case(self, language: str, code: str, test_code: str) -> Tuple[str, str]:
+        """Run a test case in a sandboxed child forked from the warm interpreter."""
+        limits = {
+            "cpu_seconds": self.cpu_seconds,
+            "memory_bytes": self.memory_bytes,
+            "max_processes": self.max_processes,
+            "timeout": self.timeout,
+            "node_path": self.node_path,
+            "hidden_paths": self.hidden_paths,
+            "keep_paths": self.keep_paths
+        }
+        receiver, sender = self._context.Pipe(duplex=False)
+        process = self._context.Process(
+            target=_sandbox_worker,
+            args=(sender, language, code, test_code, limits),
+            daemon=True
+        )
+        process.start()
+        sender.close()
+        try:
+            if not receiver.poll(self.timeout):
+                return "error", f"Timed out after {self.timeout} seconds"
+            return receiver.recv()
+        except EOFError:
+            # The child died without reporting, usually killed by its CPU or memory limit
+            process.join(1)
+            return "error", f"Test process exited with code {process.exitcode} (resource limit exceeded?)"
+        finally:
+            receiver.close()
+            if process.is_alive():
+                # The child leads its own process group; take down anything it spawned too
+                try:
+                    os.killpg(process.pid, signal.SIGKILL)
+                except OSError:
+                    pass
+                process.kill()
+            process.join()
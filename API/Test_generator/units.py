@@ -0,0 +1,156 @@
+import re
+import ast
+from typing import Dict, List, Any, Optional, Tuple
+
+
+# Top-level declarations in brace-delimited languages (JavaScript, TypeScript, Go, Rust, C, ...)
+_DECLARATION = re.compile(
+    r"\b(?:class|function\*?|func|fn|interface|struct|enum|trait|impl|object|namespace)\s+(?:\([^)]*\)\s*)?([A-Za-z_$][\w$]*)"
+    r"|\b(?:const|let|var)\s+([A-Za-z_$][\w$]*)\s*=\s*(?:async\s*)?(?:function\b|\([^)]*\)\s*=>|[A-Za-z_$][\w$]*\s*=>)"
+    r"|^[\w<>\[\],*&:\s]*?\b([A-Za-z_]\w*)\s*\([^;{}]*\)\s*(?:const\s*)?(?:->\s*[\w<>\[\],*&:\s]+)?\{?\s*$",
+    re.MULTILINE
+)
+_KEYWORDS = {"if", "for", "while", "switch", "catch", "with", "return", "else", "do", "try", "function"}
+
+
+def extract_units(code: str, language: str) -> Tuple[Dict[str, str], str]:
+    """
+    Split code into its top-level functions and classes.
+
+    Args:
+        code: The source code to split
+        language: Language of the code as returned by language detection
+
+    Returns:
+        Tuple of (units, residue) where units maps each unit name to its source and
+        residue holds everything outside a unit (imports, globals, top-level statements)
+    """
+    if language == "python":
+        try:
+            return _extract_python_units(code)
+        except (SyntaxError, ValueError, RecursionError, MemoryError):
+            return {}, code
+    return _extract_brace_units(code)
+
+
+def _extract_python_units(code: str) -> Tuple[Dict[str, str], str]:
+    """Extract top-level functions and classes using the ast module."""
+    tree = ast.parse(code)
+    lines = code.splitlines(keepends=True)
+    units: Dict[str, str] = {}
+    covered = set()
+
+    for node in tree.body:
+        if not isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+            continue
+        start = min([node.lineno] + [d.lineno for d in node.decorator_list]) - 1
+        end = node.end_lineno
+        units[node.name] = "".join(lines[start:end])
+        covered.update(range(start, end))
+
+    residue = "".join(line for i, line in enumerate(lines) if i not in covered)
+    return units, residue
+
+
+def _extract_brace_units(code: str) -> Tuple[Dict[str, str], str]:
+    """Extract top-level brace-delimited declarations with a small lexical scanner."""
+    units: Dict[str, str] = {}
+    residue: List[str] = []
+    depth = 0
+    unit_name: Optional[str] = None
+    unit_start = 0
+    segment_start = 0
+    boundary = 0  # End of the last top-level statement, where a declaration header may begin
+    i = 0
+    length = len(code)
+
+    while i < length:
+        char = code[i]
+        # Skip comments and string literals so braces inside them are ignored
+        if code.startswith("//", i):
+            newline = code.find("\n", i)
+            i = length if newline == -1 else newline
+            continue
+        if code.startswith("/*", i):
+            close = code.find("*/", i + 2)
+            i = length if close == -1 else close + 2
+            continue
+        if char in "\"'`":
+            i += 1
+            while i < length and code[i] != char:
+                i += 2 if code[i] == "\\" else 1
+            i += 1
+            continue
+
+        if char == "{":
+            if depth == 0:
+                header = code[boundary:i]
+                match = None
+                for candidate in _DECLARATION.finditer(header):
+                    name = next(group for group in candidate.groups() if group)
+                    if name not in _KEYWORDS:
+                        match, unit_name = candidate, name
+                        break
+                if match:
+                    # The match may begin with the newline after the previous statement.
+                    # The unit starts at the beginning of the line holding its first
+                    # non-blank character (to keep modifiers such as `export`), or at that
+                    # character itself if the previous statement ends on the same line
+                    first = boundary + match.start()
+                    while first < boundary + match.end() and code[first].isspace():
+                        first += 1
+                    unit_start = code.rfind("\n", 0, first) + 1
+                    if unit_start < boundary:
+                        unit_start = first
+                    residue.append(code[segment_start:unit_start])
+            depth += 1
+        elif char == "}":
+            depth = max(depth - 1, 0)
+            if depth == 0:
+                end = i + 1
+                if unit_name is not None:
+                    # Include a trailing semicolon (e.g. `const f = () => {...};`)
+                    while end < length and code[end] in " \t;":
+                        end += 1
+                    name = unit_name
+                    suffix = 2
+                    while name in units:
+                        name = f"{unit_name}_{suffix}"
+                        suffix += 1
+                    units[name] = code[unit_start:end]
+                    unit_name = None
+                    segment_start = end
+                boundary = end
+                i = end
+                continue
+        elif char == ";" and depth == 0:
+            boundary = i + 1
+        i += 1
+
+    if unit_name is not None:
+        # Unbalanced braces: treat the unfinished unit as residue
+        segment_start = unit_start
+    residue.append(code[segment_start:])
+    return units, "".join(residue)
+
+
+def match_unit(suite: Dict[str, Any], unit_names: List[str]) -> Optional[str]:
+    """
+    Find which unit a generated test suite targets.
+
+    Args:
+        suite: An entry of a generated `test_suite`
+        unit_names: Names of the units of the submitted code
+
+    Returns:
+        The matching unit name, or None if the suite does not target a single unit
+    """
+    target = str(suite.get("target", ""))
+    for name in unit_names:
+        if target == name or re.match(rf"{re.escape(name)}(\.|::|#|\s|$)", target):
+            return name
+
+    for name in unit_names:
+        if re.search(rf"\b{re.escape(name)}\b", target):
+            return name
+    return None
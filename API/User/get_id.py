@@ -15,4 +15,33 @@ async def get_current_user_id(
         user = supabase.auth.get_user(token)
         return user.user.id
     except Exception: 
-        raise HTTPException(status_code=401, detail="Invalid token")
\ No newline at end of file
+        raise HTTPException(status_code=401, detail="Invalid token")
+
+
+async def get_optional_user_id(
+    authorization: Optional[str] = Header(None),
+    supabase: Client = None
+) -> Optional[str]:
+    """Like get_current_user_id, but returns None for anonymous requests without a token."""
+    if not authorization:
+        return None
+    return await get_current_user_id(authorization=authorization, supabase=supabase)
+
+
+def user_id_dependency(supabase: Client, optional: bool = False):
+    """
+    Build a FastAPI dependency that resolves the caller's user id from the bearer token.
+
+    Use it as `Depends(user_id_dependency(supabase))`. Passing the coroutine function
+    itself matters: `Depends(lambda: get_current_user_id(...))` hands the route an
+    unawaited coroutine instead of an id.
+
+    Args:
+        supabase: Supabase client used to verify the token
+        optional: If True, requests without a token resolve to None instead of a 401
+    """
+    resolve = get_optional_user_id if optional else get_current_user_id
+
+    async def dependency(authorization: Optional[str] = Header(None)) -> Optional[str]:
+        return await resolve(authorization=authorization, supabase=supabase)
+    return dependency
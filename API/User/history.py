@@ -1,8 +1,12 @@
+import ast
 from fastapi import APIRouter, HTTPException, Depends, Header
+from fastapi.responses import StreamingResponse
 from supabase import Client
 from pydantic import BaseModel
-from typing import Optional
+from typing import Dict, Any, Iterator, Optional
 from .get_id import get_current_user_id
+from .usage import record_usage, HISTORY_PAGE_SIZE
+from ..Test_generator.export import export_results, is_valid_module
 
 router = APIRouter()
 
@@ -12,6 +16,29 @@ class History(BaseModel):
     result: str
 
 
+def iter_generated_tests(supabase: Client, user_id: str) -> Iterator[Dict[str, Any]]:
+    """Yield a user's stored test generation results, oldest first, one page at a time."""
+    offset = 0
+    while True:
+        rows = (
+            supabase.table("user_history").select("id, result")
+            .eq("user_id", user_id).eq("action", "test_generation")
+            .order("created_at").range(offset, offset + HISTORY_PAGE_SIZE - 1).execute().data
+        )
+        for row in rows:
+            # Results are stored as str(dict), see /generate-tests
+            try:
+                result = ast.literal_eval(row["result"])
+            except (ValueError, SyntaxError):
+                print(f"Skipping unparsable history record {row.get('id')}")
+                continue
+            if isinstance(result, dict):
+                yield result
+        if len(rows) < HISTORY_PAGE_SIZE:
+            break
+        offset += HISTORY_PAGE_SIZE
+
+
 def create_history_routes(supabase: Client):
     def get_current_user_id_dep(supabase):
        async def dependency(authorization: Optional[str] = Header(None)):
@@ -27,8 +54,19 @@ def create_history_routes(supabase: Client):
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
 
+    @router.get("/export")
+    async def export_history(module: str = "solution", user_id: str = Depends(get_current_user_id_dep(supabase))):
+        # History is read page by page while the zip is streamed, so it is never held in full
+        if not is_valid_module(module):
+            raise HTTPException(status_code=400, detail=f"Invalid module name: {module}")
+        return StreamingResponse(
+            export_results(iter_generated_tests(supabase, user_id), module),
+            media_type="application/zip",
+            headers={"Content-Disposition": 'attachment; filename="history_tests.zip"'}
+        )
+
     @router.post("/save-history/")
-    async def save_history(history: History, user_id: str = Depends(lambda: get_current_user_id(supabase=supabase))):
+    async def save_history(history: History, user_id: str = Depends(get_current_user_id_dep(supabase))):
         try:
             data = {
                 "user_id": user_id,
@@ -37,6 +75,7 @@ def create_history_routes(supabase: Client):
                 "result": history.result,
             }
             supabase.table("user_history").insert(data).execute()
+            record_usage(supabase, user_id, history.action, history.code)
             return {"message": "History saved successfully"}
         except Exception as e:
             raise HTTPException(status_code=500, detail=str(e))
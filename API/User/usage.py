@@ -0,0 +1,227 @@
+"""
+Per-user usage rollups, bucketed by user, action and UTC day.
+
+Rollups are updated incrementally whenever a history record is written, so usage
+dashboards read O(buckets) rows instead of scanning user_history. OpenAI calls made by
+background prefetches have no history record and are rolled up under the "prefetch"
+action. Rollups rely on this table and function in the Supabase database:
+
+    create table usage_rollups (
+        user_id     uuid             not null,
+        action      text             not null,
+        day         date             not null,
+        count       bigint           not null default 0,
+        bytes       bigint           not null default 0,
+        tokens      bigint           not null default 0,
+        latency_ms  double precision not null default 0,
+        primary key (user_id, action, day)
+    );
+
+    create function increment_usage_rollup(
+        p_user_id uuid, p_action text, p_day date, p_count bigint,
+        p_bytes bigint, p_tokens bigint, p_latency_ms double precision
+    ) returns void language sql as $$
+        insert into usage_rollups values (p_user_id, p_action, p_day, p_count, p_bytes, p_tokens, p_latency_ms)
+        on conflict (user_id, action, day) do update set
+            count = usage_rollups.count + excluded.count,
+            bytes = usage_rollups.bytes + excluded.bytes,
+            tokens = usage_rollups.tokens + excluded.tokens,
+            latency_ms = usage_rollups.latency_ms + excluded.latency_ms;
+    $$;
+
+Counts and bytes can be backfilled from existing history with the command below. Token
+and latency totals are not stored in user_history, so the rebuild keeps them as they are:
+
+    python -m API.User.usage rebuild
+"""
+import os
+import argparse
+from collections import defaultdict
+from datetime import datetime, date, timezone
+from typing import Dict, List, Any, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Depends, Header
+from supabase import Client, create_client
+from dotenv import load_dotenv
+from .get_id import get_current_user_id
+
+router = APIRouter()
+
+ROLLUP_TABLE = "usage_rollups"
+HISTORY_PAGE_SIZE = 1000
+# Actions recorded by record_usage alone, with no user_history rows to rebuild them from
+UNLOGGED_ACTIONS = ("prefetch",)
+
+
+def record_usage(
+    supabase: Client,
+    user_id: str,
+    action: str,
+    code: str,
+    tokens: int = 0,
+    latency_ms: float = 0,
+    day: Optional[date] = None
+) -> None:
+    """
+    Add one history record to the user's rollup bucket for its action and day.
+
+    Args:
+        supabase: Supabase client
+        user_id: The user the record belongs to
+        action: History action, e.g. "test_generation", "validation" or "prefetch"
+        code: The submitted code or config stored with the record (counted in bytes)
+        tokens: OpenAI tokens spent on the request
+        latency_ms: Time taken to serve the request
+        day: UTC day of the record. Defaults to today.
+    """
+    day = day or datetime.now(timezone.utc).date()
+    try:
+        supabase.rpc("increment_usage_rollup", {
+            "p_user_id": user_id,
+            "p_action": action,
+            "p_day": day.isoformat(),
+            "p_count": 1,
+            "p_bytes": len(code.encode("utf-8")),
+            "p_tokens": tokens,
+            "p_latency_ms": latency_ms
+        }).execute()
+    except Exception as e:
+        # Rollups are derived data and can be rebuilt, so never fail the request over them
+        print(f"Usage rollup error: {e}")
+
+
+def summarize(rows: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """Aggregate rollup rows into totals overall and per action."""
+    fields = ("count", "bytes", "tokens", "latency_ms")
+    totals = dict.fromkeys(fields, 0)
+    by_action: Dict[str, Dict[str, Any]] = {}
+
+    for row in rows:
+        action = by_action.setdefault(row["action"], dict.fromkeys(fields, 0))
+        for field in fields:
+            value = row.get(field) or 0
+            action[field] += value
+            totals[field] += value
+
+    for bucket in [totals, *by_action.values()]:
+        bucket["avg_latency_ms"] = bucket["latency_ms"] / bucket["count"] if bucket["count"] else 0
+    return {"totals": totals, "by_action": by_action}
+
+
+def rebuild_rollups(supabase: Client, user_id: Optional[str] = None) -> int:
+    """
+    Recompute rollup counts and bytes from user_history.
+
+    History rows carry no token or latency data, so those totals are only ever
+    accumulated by record_usage: the rebuild leaves them untouched on existing buckets,
+    and new buckets start at zero. Buckets with no history left are reset to a count of 0,
+    except those of UNLOGGED_ACTIONS (such as prefetch), which never have history.
+
+    Args:
+        supabase: Supabase client
+        user_id: Only rebuild this user's rollups. Defaults to all users.
+
+    Returns:
+        Number of rollup buckets written
+    """
+    buckets: Dict[Tuple[str, str, str], Dict[str, Any]] = defaultdict(lambda: {"count": 0, "bytes": 0})
+    for row in _paged(supabase, "user_history", "user_id, action, code, created_at", ("created_at", "id"), user_id):
+        day = datetime.fromisoformat(row["created_at"].replace("Z", "+00:00")).astimezone(timezone.utc).date()
+        bucket = buckets[(row["user_id"], row["action"], day.isoformat())]
+        bucket["count"] += 1
+        bucket["bytes"] += len((row.get("code") or "").encode("utf-8"))
+
+    for row in _paged(supabase, ROLLUP_TABLE, "user_id, action, day", ("day", "user_id", "action"), user_id):
+        if row["action"] in UNLOGGED_ACTIONS:
+            continue
+        buckets[(row["user_id"], row["action"], row["day"])]  # Creates an empty bucket if no history is left
+
+    # Only count and bytes are sent, so the upsert keeps tokens and latency_ms of existing rows
+    records = [
+        {"user_id": uid, "action": action, "day": day, **counts}
+        for (uid, action, day), counts in buckets.items()
+    ]
+    for start in range(0, len(records), HISTORY_PAGE_SIZE):
+        supabase.table(ROLLUP_TABLE).upsert(
+            records[start:start + HISTORY_PAGE_SIZE], on_conflict="user_id,action,day"
+        ).execute()
+    return len(records)
+
+
+def _paged(
+    supabase: Client,
+    table: str,
+    columns: str,
+    order: Tuple[str, ...],
+    user_id: Optional[str] = None,
+    filters: Tuple[Tuple[str, str, Any], ...] = ()
+):
+    """
+    Yield the rows of a table (optionally one user's) in pages of HISTORY_PAGE_SIZE.
+
+    PostgREST caps the rows a single request returns, so any query that can outgrow
+    one page must go through here. `filters` holds extra (operator, column, value)
+    conditions, e.g. ("gte", "day", "2024-01-01").
+    """
+    offset = 0
+    while True:
+        query = supabase.table(table).select(columns)
+        if user_id:
+            query = query.eq("user_id", user_id)
+        for operator, column, value in filters:
+            query = getattr(query, operator)(column, value)
+        for column in order:
+            query = query.order(column)
+        rows = query.range(offset, offset + HISTORY_PAGE_SIZE - 1).execute().data
+        yield from rows
+        if len(rows) < HISTORY_PAGE_SIZE:
+            break
+        offset += HISTORY_PAGE_SIZE
+
+
+def create_usage_routes(supabase: Client):
+    def get_current_user_id_dep(supabase):
+       async def dependency(authorization: Optional[str] = Header(None)):
+           return await get_current_user_id(authorization=authorization, supabase=supabase)
+       return dependency
+
+    @router.get("/usage")
+    async def get_usage(
+        start: Optional[date] = None,
+        end: Optional[date] = None,
+        action: Optional[str] = None,
+        user_id: str = Depends(get_current_user_id_dep(supabase))
+    ):
+        try:
+            filters = []
+            if start:
+                filters.append(("gte", "day", start.isoformat()))
+            if end:
+                filters.append(("lte", "day", end.isoformat()))
+            if action:
+                filters.append(("eq", "action", action))
+            rows = list(_paged(supabase, ROLLUP_TABLE, "*", ("day", "action"), user_id, tuple(filters)))
+            return {"buckets": rows, **summarize(rows)}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    return router
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Maintain per-user usage rollups")
+    parser.add_argument("command", choices=["rebuild"], help="rebuild: backfill rollups from user_history")
+    parser.add_argument("--user-id", help="Only rebuild this user's rollups")
+    args = parser.parse_args()
+
+    load_dotenv()
+    supabase_url = os.getenv("SUPABASE_URL")
+    supabase_key = os.getenv("SUPABASE_KEY")
+    if not supabase_url or not supabase_key:
+        raise ValueError("SUPABASE_URL and SUPABASE_KEY must be set in the environment variables")
+
+    written = rebuild_rollups(create_client(supabase_url, supabase_key), args.user_id)
+    print(f"Rebuilt {written} usage rollup buckets")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+import re
+import json
+import yaml
+from typing import Tuple, Any, Optional
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+
+# Use the libyaml C loader when PyYAML was built with it; it is many times faster
+YAML_LOADER = getattr(yaml, "CSafeLoader", yaml.SafeLoader)
+
+SUPPORTED_FORMATS = ("json", "yaml")
+
+# First characters a JSON document can start with, including the NaN and Infinity
+# constants json.loads accepts. Anything else cannot be JSON, so it goes straight to
+# the YAML loader without a failed JSON parse.
+_JSON_START = set('{["-0123456789tfnNI')
+_FIRST_SIGNIFICANT = re.compile(r"[ \t\r\n\ufeff]*(.)", re.DOTALL)
+
+
+def sniff_format(content: str) -> str:
+    """
+    Guess whether content is JSON or YAML from its first significant character.
+
+    Returns:
+        "json" if the content may be JSON, otherwise "yaml"
+    """
+    match = _FIRST_SIGNIFICANT.match(content)
+    return "json" if match and match.group(1) in _JSON_START else "yaml"
+
+
+def format_from_filename(filename: Optional[str]) -> Optional[str]:
+    """Return the format implied by a file extension, ignoring a trailing .gz."""
+    name = (filename or "").lower()
+    if name.endswith(".gz"):
+        name = name[:-3]
+    if name.endswith(".json"):
+        return "json"
+    if name.endswith((".yaml", ".yml")):
+        return "yaml"
+    return None
+
+
+def _load_json(content: str) -> Any:
+    if orjson is not None:
+        try:
+            return orjson.loads(content)
+        except orjson.JSONDecodeError:
+            # orjson rejects some documents json accepts (NaN, integers over 64 bits),
+            # so defer to json for the final verdict
+            pass
+    return json.loads(content)
+
+
+def load_content(content: str, format: Optional[str] = None) -> Tuple[bool, str, Any]:
+    """
+    Parse JSON or YAML content.
+
+    Args:
+        content: The document to parse
+        format: "json" or "yaml" to skip format detection. If None, the format is sniffed
+            and JSON-looking content that fails to parse as JSON is retried as YAML.
+
+    Returns:
+        (is_valid, error_message, data)
+    """
+    if format is not None and format not in SUPPORTED_FORMATS:
+        return False, f"Unsupported format: {format}", None
+
+    if format == "json" or (format is None and sniff_format(content) == "json"):
+        try:
+            return True, "", _load_json(content)
+        except json.JSONDecodeError as e:
+            if format == "json":
+                return False, f"JSON Error: {str(e)}", None
+    # Try YAML
+    try:
+        data = yaml.load(content, Loader=YAML_LOADER)
+        return True, "", data
+    except yaml.YAMLError as e:
+        return False, f"YAML Error: {str(e)}", None
+    except Exception as e:
+        return False, f"Error loading content: {str(e)}", None
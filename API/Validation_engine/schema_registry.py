@@ -0,0 +1,239 @@
+import json
+import threading
+from typing import Dict, List, Any, Optional, Tuple
+from fastapi import APIRouter, HTTPException, Depends, Header
+from pydantic import BaseModel, Field
+from jsonschema import validators
+from jsonschema.exceptions import SchemaError
+from referencing import Registry, Resource
+from referencing.exceptions import NoSuchResource
+from referencing.jsonschema import specification_with, DRAFT202012
+from .load_conf import load_content
+from ..User.get_id import get_current_user_id
+
+router = APIRouter()
+
+URI_PREFIX = "urn:testmate:schema:"
+
+
+class SchemaRegistration(BaseModel):
+    name: str
+    version: str
+    schema_: str = Field(alias="schema")
+    format: Optional[str] = None
+
+
+def schema_uri(name: str, version: str) -> str:
+    """URI under which a registered schema can be referenced with `$ref`."""
+    return f"{URI_PREFIX}{name}:{version}"
+
+
+def parse_schema_id(schema_id: str) -> Tuple[str, str]:
+    """Split a schema id of the form `name@version`."""
+    name, _, version = schema_id.rpartition("@")
+    if not name or not version:
+        raise ValueError(f"Invalid schema id '{schema_id}', expected 'name@version'")
+    return name, version
+
+
+class SchemaRegistry:
+    """
+    Stores JSON schemas by name and version and keeps a compiled validator for each.
+
+    Registered schemas reference each other with `$ref` to `urn:testmate:schema:<name>:<version>`
+    (or to their own `$id`). References are resolved from this registry only, never over the
+    network. Schemas are persisted in the `schema_registry` table so they survive restarts;
+    entries missing from memory are loaded from there on first use:
+
+        create table schema_registry (
+            name     text not null,
+            version  text not null,
+            schema   text not null,
+            ref_id   text unique,  -- the schema's `$id`, if any
+            owner    uuid,
+            primary key (name, version)
+        );
+
+    A registered version is immutable, so validators and `$ref`s pointing at it never
+    change behind their users' backs; changes are published as a new version.
+    """
+
+    TABLE = "schema_registry"
+
+    def __init__(self, supabase=None):
+        """
+        Initialize the SchemaRegistry.
+
+        Args:
+            supabase: Supabase client used to persist schemas. If None, schemas are kept in memory only.
+        """
+        self.supabase = supabase
+        self._schemas: Dict[Tuple[str, str], Any] = {}
+        self._validators: Dict[Tuple[str, str], Any] = {}
+        self._registry = Registry(retrieve=self._retrieve)
+        self._lock = threading.Lock()
+
+    def register(self, name: str, version: str, content: str, format: Optional[str] = None, owner: Optional[str] = None) -> Tuple[bool, str]:
+        """
+        Parse, check and store a schema, and compile its validator.
+
+        Returns:
+            (is_valid, error_message)
+        """
+        if "@" in name or ":" in name or ":" in version:
+            return False, "Schema name may not contain '@' or ':' and version may not contain ':'"
+
+        valid, error, schema = load_content(content, format)
+        if not valid:
+            return False, f"Schema content validation failed: {error}"
+        if not isinstance(schema, (dict, bool)):
+            return False, "Schema must be a JSON object or boolean"
+        try:
+            validators.validator_for(schema).check_schema(schema)
+        except SchemaError as e:
+            return False, f"Invalid schema: {e.message}"
+
+        schema_id = f"{name}@{version}"
+        if self.get_schema(name, version) is not None:
+            return False, f"Schema {schema_id} is already registered; register a new version instead"
+        ref_id = _ref_id(schema)
+        if ref_id is not None:
+            existing = self._find_by_ref_id(ref_id)
+            if existing is not None:
+                return False, f"$id {ref_id} is already used by schema {existing[0]}@{existing[1]}"
+
+        if self.supabase is not None:
+            try:
+                # A plain insert: the primary key rejects a concurrent registration of the same version
+                self.supabase.table(self.TABLE).insert({
+                    "name": name,
+                    "version": version,
+                    "schema": json.dumps(schema),
+                    "ref_id": ref_id,
+                    "owner": owner
+                }).execute()
+            except Exception as e:
+                return False, f"Error storing schema: {str(e)}"
+
+        self._add(name, version, schema)
+        # Compile eagerly so the first validation call does not pay for it
+        self.get_validator(name, version)
+        return True, ""
+
+    def get_schema(self, name: str, version: str) -> Optional[Any]:
+        """Return a registered schema, loading it from storage if needed."""
+        key = (name, version)
+        if key not in self._schemas and self.supabase is not None:
+            rows = self.supabase.table(self.TABLE).select("schema").eq("name", name).eq("version", version).execute().data
+            if rows:
+                self._add(name, version, json.loads(rows[0]["schema"]))
+        return self._schemas.get(key)
+
+    def list_schemas(self) -> List[Dict[str, str]]:
+        """List the name, version and id of all registered schemas."""
+        keys = set(self._schemas)
+        if self.supabase is not None:
+            rows = self.supabase.table(self.TABLE).select("name, version").execute().data
+            keys.update((row["name"], row["version"]) for row in rows)
+        return [
+            {"name": name, "version": version, "id": f"{name}@{version}", "uri": schema_uri(name, version)}
+            for name, version in sorted(keys)
+        ]
+
+    def get_validator(self, name: str, version: str) -> Optional[Any]:
+        """Return the compiled validator of a registered schema."""
+        key = (name, version)
+        validator = self._validators.get(key)
+        if validator is None:
+            schema = self.get_schema(name, version)
+            if schema is None:
+                return None
+            cls = validators.validator_for(schema)
+            validator = cls(schema, registry=self._registry)
+            self._validators[key] = validator
+        return validator
+
+    def _find_by_ref_id(self, ref_id: str) -> Optional[Tuple[str, str]]:
+        """Return (name, version) of the schema whose `$id` is `ref_id`, loading it if needed."""
+        for key, schema in list(self._schemas.items()):
+            if _ref_id(schema) == ref_id:
+                return key
+        if self.supabase is not None:
+            rows = self.supabase.table(self.TABLE).select("name, version, schema").eq("ref_id", ref_id).execute().data
+            if rows:
+                self._add(rows[0]["name"], rows[0]["version"], json.loads(rows[0]["schema"]))
+                return rows[0]["name"], rows[0]["version"]
+        return None
+
+    def _add(self, name: str, version: str, schema: Any) -> None:
+        resource = Resource.from_contents(schema, default_specification=_specification(schema))
+        resources = [(schema_uri(name, version), resource)]
+        if _ref_id(schema) is not None:
+            resources.append((_ref_id(schema), resource))
+        with self._lock:
+            self._schemas[(name, version)] = schema
+            # Validators built earlier keep their registry; references to this schema still
+            # resolve from them through the registry's retrieve callback
+            self._registry = self._registry.with_resources(resources)
+
+    def _retrieve(self, uri: str) -> Resource:
+        """Resolve `$ref`s, by registry URI or by `$id`, to schemas that are not loaded in memory yet."""
+        schema = None
+        if uri.startswith(URI_PREFIX):
+            name, _, version = uri[len(URI_PREFIX):].rpartition(":")
+            schema = self.get_schema(name, version) if name else None
+        else:
+            key = self._find_by_ref_id(uri.rstrip("#"))
+            schema = self._schemas.get(key) if key is not None else None
+        if schema is not None:
+            return Resource.from_contents(schema, default_specification=_specification(schema))
+        raise NoSuchResource(ref=uri)
+
+
+def _ref_id(schema: Any) -> Optional[str]:
+    """The `$id` of a schema without an empty trailing fragment, or None."""
+    if isinstance(schema, dict) and isinstance(schema.get("$id"), str) and schema["$id"].rstrip("#"):
+        return schema["$id"].rstrip("#")
+    return None
+
+
+def _specification(schema: Any):
+    """The JSON Schema draft a schema uses, defaulting to the latest for schemas without `$schema`."""
+    dialect = schema.get("$schema") if isinstance(schema, dict) else None
+    return specification_with(dialect, default=DRAFT202012) if dialect else DRAFT202012
+
+
+def create_schema_routes(schema_registry: SchemaRegistry, supabase=None):
+    def get_current_user_id_dep(supabase):
+        async def dependency(authorization: Optional[str] = Header(None)):
+            return await get_current_user_id(authorization=authorization, supabase=supabase)
+        return dependency
+
+    @router.post("/register")
+    async def register_schema(registration: SchemaRegistration, user_id: str = Depends(get_current_user_id_dep(supabase))):
+        valid, error = schema_registry.register(
+            registration.name, registration.version, registration.schema_, registration.format, owner=user_id
+        )
+        if not valid:
+            raise HTTPException(status_code=400, detail=error)
+        return {
+            "message": "Schema registered successfully",
+            "id": f"{registration.name}@{registration.version}",
+            "uri": schema_uri(registration.name, registration.version)
+        }
+
+    @router.get("/")
+    async def list_schemas():
+        try:
+            return {"schemas": schema_registry.list_schemas()}
+        except Exception as e:
+            raise HTTPException(status_code=500, detail=str(e))
+
+    @router.get("/{name}/{version}")
+    async def get_schema(name: str, version: str):
+        schema = schema_registry.get_schema(name, version)
+        if schema is None:
+            raise HTTPException(status_code=404, detail=f"Schema {name}@{version} not found")
+        return {"id": f"{name}@{version}", "uri": schema_uri(name, version), "schema": schema}
+
+    return router
@@ -2,8 +2,11 @@ import os
 import json
 import yaml
 import argparse
-from typing import List, Tuple, Dict, Any
+from typing import List, Tuple, Dict, Any, Optional
 from jsonschema import validate, ValidationError
+from jsonschema.exceptions import best_match
+from referencing.exceptions import Unresolvable
+from .load_conf import load_content
 
 
 def validate_config_against_schema(config_data: Dict[Any, Any], schema_data: Dict[Any, Any]) -> Tuple[bool, str]:
@@ -21,33 +24,24 @@ def validate_config_against_schema(config_data: Dict[Any, Any], schema_data: Dic
 
 
 
-def validate_content_with_schema(config_content: str, schema_content: str) -> Tuple[bool, str]:
+def validate_content_with_schema(
+    config_content: str,
+    schema_content: str,
+    config_format: Optional[str] = None,
+    schema_format: Optional[str] = None
+) -> Tuple[bool, str]:
     """
     Validate config and schema provided as strings (JSON or YAML).
+    Formats are detected from the content unless config_format/schema_format
+    ("json" or "yaml") are given.
     Returns (is_valid, error_message)
     """
-    def load_content(content: str) -> Tuple[bool, str, Any]:
-        # Try JSON first
-        try:
-            data = json.loads(content)
-            return True, "", data
-        except json.JSONDecodeError:
-            pass
-        # Try YAML
-        try:
-            data = yaml.safe_load(content)
-            return True, "", data
-        except yaml.YAMLError as e:
-            return False, f"YAML Error: {str(e)}", None
-        except Exception as e:
-            return False, f"Error loading content: {str(e)}", None
-
     # Load schema content
-    schema_valid, schema_error, schema_data = load_content(schema_content)
+    schema_valid, schema_error, schema_data = load_content(schema_content, schema_format)
     if not schema_valid:
         return False, f"Schema content validation failed: {schema_error}"
     # Load config content
-    config_valid, config_error, config_data = load_content(config_content)
+    config_valid, config_error, config_data = load_content(config_content, config_format)
     if not config_valid:
         return False, f"Config content validation failed: {config_error}"
     # Validate config against schema
@@ -56,3 +50,23 @@ def validate_content_with_schema(config_content: str, schema_content: str) -> Tu
         return False, f"Schema validation error: {validation_error}"
     return True, ""
 
+
+def validate_content_with_validator(config_content: str, validator: Any, config_format: Optional[str] = None) -> Tuple[bool, str]:
+    """
+    Validate config provided as a string (JSON or YAML) with a precompiled validator,
+    such as one from the schema registry.
+    Returns (is_valid, error_message)
+    """
+    config_valid, config_error, config_data = load_content(config_content, config_format)
+    if not config_valid:
+        return False, f"Config content validation failed: {config_error}"
+    try:
+        # Same error selection as jsonschema.validate
+        error = best_match(validator.iter_errors(config_data))
+    except Unresolvable as e:
+        return False, f"Schema validation error: Unresolvable reference: {str(e)}"
+    except Exception as e:
+        return False, f"Schema validation error: Unexpected error during schema validation: {str(e)}"
+    if error is not None:
+        return False, f"Schema validation error: Schema validation error: {str(error)}"
+    return True, ""
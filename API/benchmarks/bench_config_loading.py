@@ -0,0 +1,89 @@
+"""
+Benchmark config parsing throughput of the validation engine.
+
+Compares the original loader (json.loads, then pure-Python yaml.safe_load on failure)
+with load_content using format sniffing and with an explicit format hint, for JSON and
+YAML configs of increasing size.
+
+Usage:
+    python -m API.benchmarks.bench_config_loading [--sizes 1K,100K,1M,10M,50M] [--repeat N]
+"""
+import json
+import time
+import argparse
+from typing import Any, Callable, Dict, List
+
+import yaml
+
+from ..Validation_engine.load_conf import load_content, YAML_LOADER, orjson
+
+
+def baseline_load(content: str) -> Any:
+    """The loader validate_content_with_schema used before format sniffing."""
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        pass
+    return yaml.safe_load(content)
+
+
+def make_config(size: int) -> Dict[str, Any]:
+    """Build a config dictionary whose JSON rendering is roughly `size` bytes."""
+    services: List[Dict[str, Any]] = []
+    config = {"version": 3, "name": "benchmark", "services": services}
+    approx = 0
+    while approx < size:
+        index = len(services)
+        service = {
+            "name": f"service-{index}",
+            "image": f"registry.example.com/team/service-{index}:1.{index % 10}",
+            "replicas": index % 5 + 1,
+            "enabled": index % 3 != 0,
+            "ports": [8000 + index % 100, 9000 + index % 100],
+            "env": {"LOG_LEVEL": "info", "TIMEOUT": 30.5, "REGION": "eu-west-1"},
+        }
+        services.append(service)
+        approx += 260
+    return config
+
+
+def parse_size(text: str) -> int:
+    units = {"K": 1024, "M": 1024 * 1024}
+    text = text.strip().upper()
+    return int(float(text[:-1]) * units[text[-1]]) if text[-1] in units else int(text)
+
+
+def throughput(loader: Callable[[str], Any], content: str, repeat: int) -> float:
+    """Return parse throughput in MB/s (best of `repeat` runs)."""
+    best = float("inf")
+    for _ in range(repeat):
+        started = time.perf_counter()
+        loader(content)
+        best = min(best, time.perf_counter() - started)
+    return len(content.encode("utf-8")) / (1024 * 1024) / best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", default="1K,100K,1M,10M,50M", help="Comma-separated config sizes")
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per measurement (best is reported)")
+    args = parser.parse_args()
+
+    print(f"YAML loader: {YAML_LOADER.__name__}, fast JSON: {'orjson' if orjson else 'none'}")
+    print(f"{'format':<6} {'size':>8} {'baseline MB/s':>14} {'sniffed MB/s':>13} {'hinted MB/s':>12} {'same':>5}")
+    for size in [parse_size(s) for s in args.sizes.split(",")]:
+        config = make_config(size)
+        documents = {
+            "json": json.dumps(config, indent=2),
+            "yaml": yaml.dump(config, Dumper=getattr(yaml, "CSafeDumper", yaml.SafeDumper), sort_keys=False),
+        }
+        for fmt, content in documents.items():
+            same = baseline_load(content) == load_content(content)[2] == load_content(content, fmt)[2]
+            base = throughput(baseline_load, content, args.repeat)
+            sniffed = throughput(lambda c: load_content(c), content, args.repeat)
+            hinted = throughput(lambda c: load_content(c, fmt), content, args.repeat)
+            print(f"{fmt:<6} {len(content) / 1024:>7.0f}K {base:>14.2f} {sniffed:>13.2f} {hinted:>12.2f} {str(same):>5}")
+
+
+if __name__ == "__main__":
+    main()
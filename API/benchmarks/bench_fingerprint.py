@@ -0,0 +1,162 @@
+"""
+Benchmark exact-hash vs canonical fingerprinting of submitted code.
+
+Builds a corpus of near-duplicate submissions (reformatted, re-commented, re-quoted and
+locally renamed variants of each seed snippet) and reports the cache hit rate each
+fingerprint achieves plus its cost per KB.
+
+Usage:
+    python -m API.benchmarks.bench_fingerprint [SOURCE_DIR] [--variants N]
+
+SOURCE_DIR is an optional directory of .py/.js files used as additional seeds.
+"""
+import os
+import re
+import ast
+import time
+import random
+import hashlib
+import argparse
+from typing import Callable, List
+
+from ..Test_generator.fingerprint import canonical_fingerprint
+
+
+SEEDS = [
+    '''def add_numbers(a, b):
+    """Add two numbers."""
+    total = a + b
+    return total
+
+
+class Calculator:
+    def __init__(self):
+        self.history = []
+
+    def add(self, a, b):
+        result = a + b
+        self.history.append(f"{a} + {b} = {result}")
+        return result
+''',
+    '''def parse_config(path, default="config.yaml"):
+    import json
+    with open(path or default) as handle:
+        data = json.load(handle)
+    keys = [key.lower() for key in data]
+    return dict(zip(keys, data.values()))
+''',
+    '''function addNumbers(a, b) {
+    return a + b;
+}
+
+class Calculator {
+    constructor() {
+        this.history = [];
+    }
+
+    add(a, b) {
+        const result = a + b;
+        this.history.push("add");
+        return result;
+    }
+}
+''',
+]
+
+
+class _RenameLocals(ast.NodeTransformer):
+    """Rename every stored local name inside functions, as a copy-paste edit would."""
+
+    def visit_FunctionDef(self, node):
+        stored = {n.id for n in ast.walk(node) if isinstance(n, ast.Name) and isinstance(n.ctx, ast.Store)}
+        for child in ast.walk(node):
+            if isinstance(child, ast.Name) and child.id in stored:
+                child.id += "_renamed"
+        return node
+
+
+def _python_variants(code: str) -> List[Callable[[str], str]]:
+    return [
+        lambda c: ast.unparse(ast.parse(c)),
+        lambda c: re.sub(r"\n(\s*)(return|self)", r"\n\1# explanatory comment\n\1\2", c),
+        lambda c: c.replace('"', "'"),
+        lambda c: ast.unparse(_RenameLocals().visit(ast.parse(c))),
+        lambda c: c.replace("    ", "\t"),
+    ]
+
+
+def _generic_variants(code: str) -> List[Callable[[str], str]]:
+    return [
+        lambda c: re.sub(r"[ \t]+", " ", c),
+        lambda c: re.sub(r"\n(\s*)(return)", r"\n\1// explanatory comment\n\1\2", c),
+        lambda c: c.replace('"', "'"),
+        lambda c: "/* header */\n" + c.replace("\n\n", "\n"),
+        lambda c: c.replace("    ", "  "),
+    ]
+
+
+def build_corpus(seeds: List[str], variants: int, rng: random.Random) -> List[str]:
+    """Produce `variants` randomly mutated copies of each seed, interleaved."""
+    corpus = []
+    for seed in seeds:
+        try:
+            ast.parse(seed)
+            mutations = _python_variants(seed)
+        except SyntaxError:
+            mutations = _generic_variants(seed)
+        corpus.append(seed)
+        for _ in range(variants):
+            code = seed
+            for mutation in rng.sample(mutations, rng.randint(1, len(mutations))):
+                code = mutation(code)
+            corpus.append(code)
+    rng.shuffle(corpus)
+    return corpus
+
+
+def measure(corpus: List[str], key: Callable[[str], str]):
+    """Return (hit_rate, microseconds_per_kb) for a fingerprint function over the corpus."""
+    seen = set()
+    hits = 0
+    total_bytes = sum(len(code.encode("utf-8")) for code in corpus)
+    started = time.perf_counter()
+    for code in corpus:
+        fp = key(code)
+        if fp in seen:
+            hits += 1
+        seen.add(fp)
+    elapsed = time.perf_counter() - started
+    return hits / len(corpus), elapsed * 1e6 / (total_bytes / 1024)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("source_dir", nargs="?", help="Directory of .py/.js files used as extra seeds")
+    parser.add_argument("--variants", type=int, default=20, help="Mutated copies per seed")
+    parser.add_argument("--seed", type=int, default=0, help="Random seed")
+    args = parser.parse_args()
+
+    seeds = list(SEEDS)
+    if args.source_dir:
+        for root, _, files in os.walk(args.source_dir):
+            for name in files:
+                if name.endswith((".py", ".js")):
+                    with open(os.path.join(root, name), encoding="utf-8", errors="ignore") as f:
+                        seeds.append(f.read())
+
+    corpus = build_corpus(seeds, args.variants, random.Random(args.seed))
+    exact = lambda code: hashlib.sha256(code.encode("utf-8")).hexdigest()
+    exact_rate, exact_cost = measure(corpus, exact)
+    canonical_rate, canonical_cost = measure(corpus, canonical_fingerprint)
+    ideal = 1 - len(seeds) / len(corpus)
+
+    print(f"Corpus: {len(seeds)} seeds, {len(corpus)} submissions "
+          f"({sum(map(len, corpus)) / 1024:.1f} KB), best possible hit rate {ideal:.1%}")
+    print(f"{'fingerprint':<12} {'hit rate':>10} {'us/KB':>10}")
+    print(f"{'exact':<12} {exact_rate:>10.1%} {exact_cost:>10.1f}")
+    print(f"{'canonical':<12} {canonical_rate:>10.1%} {canonical_cost:>10.1f}")
+    print(f"Hit-rate improvement: {canonical_rate - exact_rate:+.1%}")
+
+
+if __name__ == "__main__":
+    main()
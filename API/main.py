@@ -1,14 +1,23 @@
-from fastapi import FastAPI, Depends, Header
+from fastapi import FastAPI, Depends, File, Form, UploadFile, HTTPException
 from .Test_generator.generate_tests import TestGenerator
-from .Validation_engine.validate_conf import validate_content_with_schema
+from .Validation_engine.validate_conf import validate_content_with_schema, validate_content_with_validator
+from .Validation_engine.schema_registry import SchemaRegistry, create_schema_routes, parse_schema_id
+from .Validation_engine.load_conf import format_from_filename
 from supabase import create_client, Client
 from .User.user import create_user_routes
 from .User.history import create_history_routes
-from .User.get_id import get_current_user_id
+from .User.get_id import user_id_dependency
+from .User.usage import create_usage_routes, record_usage
+from .Test_generator.metrics import track_tokens, token_metrics
+from .uploads import RequestBodyMiddleware, read_upload, check_file_count
+from .Test_generator.export import export_results, is_valid_module, detect_language
 import os
-from typing import Optional
+import time
+from typing import Any, Dict, List, Optional
+from pydantic import BaseModel, Field
 from dotenv import load_dotenv
-from fastapi.responses import PlainTextResponse
+from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse, StreamingResponse
 
 load_dotenv()
 # Initialize Supabase
@@ -16,6 +25,7 @@ SUPABASE_URL = os.getenv("SUPABASE_URL")
 SUPABASE_KEY = os.getenv("SUPABASE_KEY")
 
 test_generator = TestGenerator(os.getenv("OPENAI_API_KEY"))
+test_generator.runner.warm_up()
 generate_tests = test_generator.generate_tests
 
 if not SUPABASE_URL or not SUPABASE_KEY:
@@ -24,25 +34,91 @@ if not SUPABASE_URL or not SUPABASE_KEY:
 supabase: Client = create_client(SUPABASE_URL, SUPABASE_KEY)
 
 app = FastAPI()
+app.add_middleware(RequestBodyMiddleware)
+# The frontend calls the API cross-origin with an Authorization header. Added last so it
+# wraps the body middleware and its 413/415 responses carry CORS headers too.
+app.add_middleware(
+    CORSMiddleware,
+    allow_origins=[origin.strip() for origin in os.getenv("CORS_ORIGINS", "http://localhost:3000").split(",") if origin.strip()],
+    allow_methods=["GET", "POST"],
+    allow_headers=["Authorization", "Content-Type", "Content-Encoding"]
+)
 
 # Include routers
 user_router = create_user_routes(supabase)
 history_router = create_history_routes(supabase)
+usage_router = create_usage_routes(supabase)
+schema_registry = SchemaRegistry(supabase)
+schema_router = create_schema_routes(schema_registry, supabase)
 
 app.include_router(user_router, prefix="/user")
 app.include_router(history_router, prefix="/history")
+app.include_router(usage_router, prefix="/history")
+app.include_router(schema_router, prefix="/schemas")
+
+# Anonymous requests are allowed; a token, when given, must be valid
+current_user_id = user_id_dependency(supabase, optional=True)
+required_user_id = user_id_dependency(supabase)
+
+
+class PrefetchRequest(BaseModel):
+    code: str
+
+
+class GenerateTestsRequest(BaseModel):
+    code: str
+    verify: bool = False
+
+
+class ExportRequest(BaseModel):
+    results: List[Dict[str, Any]]  # results of /generate-tests (or /generate-tests/upload)
+    module: str = "solution"  # module the exported tests import the code under test from
+
+
+class ValidateConfigRequest(BaseModel):
+    config: str
+    schema_: Optional[str] = Field(None, alias="schema")
+    schema_id: Optional[str] = None  # "name@version" of a schema registered under /schemas
+    config_format: Optional[str] = None
+    schema_format: Optional[str] = None
+
 
 @app.get("/", response_class=PlainTextResponse)
 async def home():
     return "Welcome to Testmate.io"
 
 
+@app.get("/metrics")
+async def metrics():
+    # Token usage and prompt-cache hit rates per OpenAI call stage
+    return token_metrics()
+
+
+@app.post("/prefetch", status_code=202)
+async def prefetch_endpoint(request: PrefetchRequest, user_id: str = Depends(required_user_id)):
+    # Called (debounced) by the frontend while the user edits; detection and analysis run
+    # in the background so a following /generate-tests for the same code can skip them
+    if not request.code.strip():
+        return {"status": "skipped", "fingerprint": None}
+
+    def record_prefetch_usage(usage: Dict[str, Any]) -> None:
+        # Runs on the prefetch worker once its OpenAI calls are done
+        latency_ms = usage["latency_ms_cached"] + usage["latency_ms_uncached"]
+        record_usage(supabase, user_id, "prefetch", request.code, tokens=usage["total_tokens"], latency_ms=latency_ms)
+
+    return test_generator.prefetch(request.code, user_id, on_usage=record_prefetch_usage)
+
+
 @app.post("/generate-tests")
 async def generate_tests_endpoint(
     code: str, 
-    user_id: Optional[str] = Depends(lambda: get_current_user_id(supabase=supabase))
+    verify: bool = False,
+    user_id: Optional[str] = Depends(current_user_id)
 ):
-    result = generate_tests(code)
+    started = time.perf_counter()
+    with track_tokens() as usage:
+        result = generate_tests(code, verify=verify, user_id=user_id)
+    latency_ms = (time.perf_counter() - started) * 1000
     
     # Save to history
     if user_id:
@@ -53,28 +129,117 @@ async def generate_tests_endpoint(
             "result": str(result)
         }
         supabase.table("user_history").insert(history_data).execute()
+        record_usage(supabase, user_id, "test_generation", code, tokens=usage["total_tokens"], latency_ms=latency_ms)
     
     return result
 
+def get_registered_validator(schema_id: str):
+    try:
+        name, version = parse_schema_id(schema_id)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    validator = schema_registry.get_validator(name, version)
+    if validator is None:
+        raise HTTPException(status_code=404, detail=f"Schema {schema_id} not found")
+    return validator
+
 @app.post("/validate-config")
 async def validate_config_endpoint(
     config:str,  #json string formate
-    schema:str,
-    user_id: Optional[str] = Depends(lambda: get_current_user_id(supabase=supabase))
+    schema: Optional[str] = None,
+    schema_id: Optional[str] = None,  # "name@version" of a registered schema, instead of schema
+    config_format: Optional[str] = None,  # "json" or "yaml", detected if omitted
+    schema_format: Optional[str] = None,
+    user_id: Optional[str] = Depends(current_user_id)
 ):
-    result = validate_content_with_schema(config, schema)
+    started = time.perf_counter()
+    if schema_id:
+        result = validate_content_with_validator(config, get_registered_validator(schema_id), config_format)
+    elif schema is not None:
+        result = validate_content_with_schema(config, schema, config_format, schema_format)
+    else:
+        raise HTTPException(status_code=400, detail="Either schema or schema_id is required")
+    latency_ms = (time.perf_counter() - started) * 1000
     
     # Save to history
     if user_id:
 
         history_data = {
             "user_id": user_id,  # Now this is the authenticated user's ID
-            "code": f"config: {config} schema:{schema}",
+            "code": f"config: {config} schema:{schema if schema_id is None else schema_id}",
             "action": "validation",
             "result": str(result)
         }
         supabase.table("user_history").insert(history_data).execute()
+        record_usage(supabase, user_id, "validation", history_data["code"], latency_ms=latency_ms)
     
     return result
 
 
+@app.post("/generate-tests/json")
+async def generate_tests_json_endpoint(
+    request: GenerateTestsRequest,
+    user_id: Optional[str] = Depends(current_user_id)
+):
+    return await generate_tests_endpoint(request.code, verify=request.verify, user_id=user_id)
+
+
+@app.post("/generate-tests/upload")
+async def generate_tests_upload_endpoint(
+    files: List[UploadFile] = File(...),
+    verify: bool = Form(False),
+    user_id: Optional[str] = Depends(current_user_id)
+):
+    check_file_count(files)
+    results = []
+    for file in files:
+        code = await read_upload(file)
+        result = await generate_tests_endpoint(code, verify=verify, user_id=user_id)
+        results.append({"filename": file.filename, **result})
+    return {"results": results}
+
+
+@app.post("/generate-tests/export")
+async def export_tests_endpoint(request: ExportRequest):
+    # Streams the suites as a zip of runnable test files, built while it is sent
+    languages = {detect_language(result) for result in request.results if "error" not in result}
+    if not is_valid_module(request.module, languages):
+        raise HTTPException(status_code=400, detail=f"Invalid module name: {request.module}")
+    return StreamingResponse(
+        export_results(request.results, request.module),
+        media_type="application/zip",
+        headers={"Content-Disposition": 'attachment; filename="tests.zip"'}
+    )
+
+
+@app.post("/validate-config/json")
+async def validate_config_json_endpoint(
+    request: ValidateConfigRequest,
+    user_id: Optional[str] = Depends(current_user_id)
+):
+    return await validate_config_endpoint(
+        request.config, request.schema_, schema_id=request.schema_id,
+        config_format=request.config_format, schema_format=request.schema_format, user_id=user_id
+    )
+
+
+@app.post("/validate-config/upload")
+async def validate_config_upload_endpoint(
+    configs: List[UploadFile] = File(...),
+    schema_file: Optional[UploadFile] = File(None, alias="schema"),  # "schema" would shadow BaseModel.schema
+    schema_id: Optional[str] = Form(None),
+    user_id: Optional[str] = Depends(current_user_id)
+):
+    check_file_count(configs)
+    schema_content = await read_upload(schema_file) if schema_file is not None else None
+    results = []
+    for file in configs:
+        config = await read_upload(file)
+        is_valid, error = await validate_config_endpoint(
+            config, schema_content, schema_id=schema_id,
+            config_format=format_from_filename(file.filename),
+            schema_format=format_from_filename(schema_file.filename) if schema_file is not None else None,
+            user_id=user_id
+        )
+        results.append({"filename": file.filename, "valid": is_valid, "error": error})
+    return {"results": results}
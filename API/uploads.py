@@ -0,0 +1,156 @@
+import os
+import json
+import zlib
+from typing import List
+
+from fastapi import HTTPException, UploadFile
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
+
+
+# Limits apply to the decompressed size, so a small gzip body cannot expand without bound
+MAX_REQUEST_BYTES = int(os.getenv("MAX_REQUEST_BYTES", 50 * 1024 * 1024))
+MAX_FILE_BYTES = int(os.getenv("MAX_FILE_BYTES", 10 * 1024 * 1024))
+MAX_FILES_PER_REQUEST = int(os.getenv("MAX_FILES_PER_REQUEST", 20))
+CHUNK_SIZE = 64 * 1024
+
+
+def _inflate(decompressor, data: bytes, remaining: int) -> bytes:
+    """
+    Decompress the next piece of a gzip stream into at most `remaining + 1` bytes.
+
+    Input left over from a previous call that hit its limit is consumed first. zlib only
+    stops early when the output limit is reached, so a result of at most `remaining`
+    bytes means every byte of input was consumed and nothing is left to flush; a longer
+    result means the limit is exceeded. flush() is never called because it has no limit.
+    """
+    return decompressor.decompress(decompressor.unconsumed_tail + data, remaining + 1)
+
+
+class RequestBodyMiddleware:
+    """
+    ASGI middleware that decompresses `Content-Encoding: gzip` request bodies as they
+    stream in and rejects bodies larger than MAX_REQUEST_BYTES with a 413.
+    """
+
+    def __init__(self, app: ASGIApp, max_bytes: int = MAX_REQUEST_BYTES):
+        self.app = app
+        self.max_bytes = max_bytes
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        headers = dict(scope["headers"])
+        encoding = headers.get(b"content-encoding", b"").decode("latin-1").strip().lower()
+        if encoding not in ("", "identity", "gzip"):
+            await self._reject(send, 415, f"Unsupported Content-Encoding: {encoding}")
+            return
+
+        declared = headers.get(b"content-length")
+        if declared and declared.isdigit() and int(declared) > self.max_bytes:
+            await self._reject(send, 413, "Request body too large")
+            return
+
+        decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if encoding == "gzip" else None
+        if decompressor:
+            # Downstream sees a plain body of unknown length
+            scope = dict(scope)
+            scope["headers"] = [
+                (name, value) for name, value in scope["headers"]
+                if name not in (b"content-encoding", b"content-length")
+            ]
+
+        received = 0
+        response_started = False
+
+        async def limited_receive() -> Message:
+            nonlocal received
+            message = await receive()
+            if message["type"] != "http.request":
+                return message
+            body = message.get("body", b"")
+            if decompressor:
+                try:
+                    body = _inflate(decompressor, body, self.max_bytes - received)
+                except zlib.error:
+                    raise HTTPException(status_code=400, detail="Invalid gzip request body")
+                if len(body) <= self.max_bytes - received and not message.get("more_body", False) and not decompressor.eof:
+                    raise HTTPException(status_code=400, detail="Truncated gzip request body")
+            received += len(body)
+            if received > self.max_bytes:
+                raise HTTPException(status_code=413, detail="Request body too large")
+            return {**message, "body": body}
+
+        async def tracking_send(message: Message) -> None:
+            nonlocal response_started
+            if message["type"] == "http.response.start":
+                response_started = True
+            await send(message)
+
+        try:
+            await self.app(scope, limited_receive, tracking_send)
+        except HTTPException as e:
+            # Raised while reading the body outside of a route's own error handling
+            if response_started:
+                raise
+            await self._reject(send, e.status_code, e.detail)
+
+    @staticmethod
+    async def _reject(send: Send, status_code: int, detail: str) -> None:
+        body = json.dumps({"detail": detail}).encode("utf-8")
+        await send({
+            "type": "http.response.start",
+            "status": status_code,
+            "headers": [(b"content-type", b"application/json"), (b"content-length", str(len(body)).encode())]
+        })
+        await send({"type": "http.response.body", "body": body})
+
+
+async def read_upload(file: UploadFile, max_bytes: int = MAX_FILE_BYTES) -> str:
+    """
+    Read an uploaded text file chunk by chunk.
+
+    Uploads are spooled to a temporary file by the multipart parser, so only the decoded
+    text is held in memory. Files named `*.gz` or sent as application/gzip are decompressed.
+
+    Args:
+        file: The uploaded file
+        max_bytes: Maximum decompressed size of the file
+
+    Returns:
+        The file content decoded as UTF-8
+    """
+    gzipped = (file.filename or "").endswith(".gz") or file.content_type in ("application/gzip", "application/x-gzip")
+    decompressor = zlib.decompressobj(16 + zlib.MAX_WBITS) if gzipped else None
+    chunks: List[bytes] = []
+    size = 0
+
+    while True:
+        chunk = await file.read(CHUNK_SIZE)
+        if not chunk:
+            break
+        if decompressor:
+            try:
+                chunk = _inflate(decompressor, chunk, max_bytes - size)
+            except zlib.error:
+                raise HTTPException(status_code=400, detail=f"Invalid gzip file: {file.filename}")
+        size += len(chunk)
+        if size > max_bytes:
+            raise HTTPException(status_code=413, detail=f"File too large: {file.filename}")
+        chunks.append(chunk)
+    if decompressor and not decompressor.eof:
+        raise HTTPException(status_code=400, detail=f"Truncated gzip file: {file.filename}")
+
+    try:
+        return b"".join(chunks).decode("utf-8")
+    except UnicodeDecodeError:
+        raise HTTPException(status_code=400, detail=f"File is not valid UTF-8 text: {file.filename}")
+
+
+def check_file_count(files: List[UploadFile]) -> None:
+    """Reject requests carrying more than MAX_FILES_PER_REQUEST files."""
+    if not files:
+        raise HTTPException(status_code=400, detail="No files uploaded")
+    if len(files) > MAX_FILES_PER_REQUEST:
+        raise HTTPException(status_code=413, detail=f"At most {MAX_FILES_PER_REQUEST} files per request")
@@ -1,8 +1,26 @@
-import React, { useState } from 'react';
+import React, { useEffect, useState } from 'react';
 import { BrowserRouter as Router, Routes, Route, useNavigate } from 'react-router-dom';
 import SignUp from './SignUp';
+import { API_URL, getAccessToken } from './api';
 import './App.css';
 
+// Wait this long after the last keystroke before asking the API to pre-analyze the draft
+const PREFETCH_DEBOUNCE_MS = 800;
+
+// Render a /generate-tests result as one block of test code per suite
+function formatTests(result) {
+  const suites = result.test_suite || [];
+  if (suites.length === 0) {
+    return '// No tests were generated for this code.';
+  }
+  return suites
+    .map((suite) => [
+      `// ${suite.target}${suite.description ? ` - ${suite.description}` : ''}`,
+      ...(suite.test_cases || []).map((testCase) => testCase.test_code),
+    ].join('\n\n'))
+    .join('\n\n');
+}
+
 function MainApp() {
   const [inputCode, setInputCode] = useState(`// Example: Paste your C#, Java, Python, or JavaScript code here.
     public class Calculator
@@ -34,11 +52,72 @@ function MainApp() {
         Assert.AreEqual(30, total);
     }`);
 
+  // The example code is only a placeholder; nothing is prefetched until the user edits it
+  const [hasEdited, setHasEdited] = useState(false);
+  const [isGenerating, setIsGenerating] = useState(false);
+
   const navigate = useNavigate();
 
-  const handleGenerateTests = () => {
-    // This would typically call your API
-    console.log('Generating tests for:', inputCode);
+  // Let the API detect and analyze the draft while the user is still editing, so
+  // "Generate Tests" only has to wait for test generation itself.
+  useEffect(() => {
+    const token = getAccessToken();
+    if (!hasEdited || !token || !inputCode.trim()) {
+      return undefined;
+    }
+    const controller = new AbortController();
+    const timer = setTimeout(() => {
+      fetch(`${API_URL}/prefetch`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          Authorization: `Bearer ${token}`,
+        },
+        body: JSON.stringify({ code: inputCode }),
+        signal: controller.signal,
+      }).catch(() => {
+        // Prefetching is best effort; generation works without it
+      });
+    }, PREFETCH_DEBOUNCE_MS);
+    return () => {
+      clearTimeout(timer);
+      controller.abort();
+    };
+  }, [inputCode, hasEdited]);
+
+  const handleCodeChange = (e) => {
+    setInputCode(e.target.value);
+    setHasEdited(true);
+  };
+
+  const handleGenerateTests = async () => {
+    if (!inputCode.trim() || isGenerating) {
+      return;
+    }
+    const token = getAccessToken();
+    setIsGenerating(true);
+    try {
+      const response = await fetch(`${API_URL}/generate-tests/json`, {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+          // Signed-in users get incremental regeneration and their prefetched analysis
+          ...(token ? { Authorization: `Bearer ${token}` } : {}),
+        },
+        body: JSON.stringify({ code: inputCode }),
+      });
+      const result = await response.json();
+      if (!response.ok || result.error) {
+        const reason = result.error || (typeof result.detail === 'string' ? result.detail : `HTTP ${response.status}`);
+        setGeneratedTests(`// Test generation failed: ${reason}`);
+        return;
+      }
+      setGeneratedTests(formatTests(result));
+    } catch (err) {
+      setGeneratedTests('// Could not reach the server. Please try again.');
+    } finally {
+      setIsGenerating(false);
+    }
   };
 
   const handleValidateConfig = () => {
@@ -93,13 +172,13 @@ function MainApp() {
             <textarea
               className="code-editor"
               value={inputCode}
-              onChange={(e) => setInputCode(e.target.value)}
+              onChange={handleCodeChange}
               placeholder="Paste your code here..."
             />
           </div>
           <div className="button-group">
-            <button className="btn btn-primary" onClick={handleGenerateTests}>
-              Generate Tests
+            <button className="btn btn-primary" onClick={handleGenerateTests} disabled={isGenerating}>
+              {isGenerating ? 'Generating...' : 'Generate Tests'}
             </button>
             <button className="btn btn-secondary" onClick={handleValidateConfig}>
               Validate Config
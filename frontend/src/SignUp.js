@@ -1,4 +1,6 @@
 import React, { useState } from 'react';
+import { useNavigate } from 'react-router-dom';
+import { API_URL, saveSession } from './api';
 import './App.css';
 
 function SignUp() {
@@ -10,6 +12,7 @@ function SignUp() {
   });
 
   const [errors, setErrors] = useState({});
+  const navigate = useNavigate();
 
   const handleInputChange = (e) => {
     const { name, value } = e.target;
@@ -57,11 +60,31 @@ function SignUp() {
     return Object.keys(newErrors).length === 0;
   };
 
-  const handleSubmit = (e) => {
+  const handleSubmit = async (e) => {
     e.preventDefault();
-    if (validateForm()) {
-      console.log('Form submitted:', formData);
-      // Here you would typically make an API call to register the user
+    if (!validateForm()) {
+      return;
+    }
+    try {
+      const response = await fetch(`${API_URL}/user/register`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json' },
+        body: JSON.stringify({
+          email: formData.email,
+          password: formData.password,
+          username: formData.username,
+        }),
+      });
+      const data = await response.json();
+      if (!response.ok) {
+        setErrors({ email: data.detail || 'Registration failed' });
+        return;
+      }
+      // The session is null while the email address still has to be confirmed
+      saveSession(data.session);
+      navigate('/');
+    } catch (err) {
+      setErrors({ email: 'Could not reach the server. Please try again.' });
     }
   };
 
@@ -0,0 +1,31 @@
+export const API_URL = process.env.REACT_APP_API_URL || 'http://localhost:8000';
+
+const SESSION_KEY = 'testmate_session';
+
+// Keep the Supabase session returned by /user/register and /user/login
+export function saveSession(session) {
+  if (session && session.access_token) {
+    localStorage.setItem(SESSION_KEY, JSON.stringify(session));
+  }
+}
+
+export function clearSession() {
+  localStorage.removeItem(SESSION_KEY);
+}
+
+// Bearer token of the stored session, or null when signed out or expired
+export function getAccessToken() {
+  try {
+    const session = JSON.parse(localStorage.getItem(SESSION_KEY));
+    if (!session || !session.access_token) {
+      return null;
+    }
+    if (session.expires_at && session.expires_at * 1000 <= Date.now()) {
+      clearSession();
+      return null;
+    }
+    return session.access_token;
+  } catch (e) {
+    return null;
+  }
+}
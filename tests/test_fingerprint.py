@@ -0,0 +1,38 @@
+from API.Test_generator.fingerprint import canonical_fingerprint
+
+
+def test_formatting_comments_and_docstrings_are_ignored():
+    a = 'def f(x):\n    """Add one."""\n    y = x + 1  # bump\n    return y\n'
+    b = "def f(x):\n    return_value = x+1\n    return return_value\n"
+    assert canonical_fingerprint(a) == canonical_fingerprint(b)
+
+
+def test_quote_style_is_ignored():
+    assert canonical_fingerprint("x = 'a'\n") == canonical_fingerprint('x = "a"\n')
+
+
+def test_behaviour_changes_are_detected():
+    assert canonical_fingerprint("def f(x):\n    return x + 1\n") != canonical_fingerprint("def f(x):\n    return x + 2\n")
+
+
+def test_parameters_and_module_names_are_not_renamed():
+    assert canonical_fingerprint("def f(x):\n    return x\n") != canonical_fingerprint("def f(y):\n    return y\n")
+    assert canonical_fingerprint("def f():\n    pass\n") != canonical_fingerprint("def g():\n    pass\n")
+
+
+def test_non_python_code_uses_token_stream():
+    a = "function f(a) {\n  // add\n  return a + 1;\n}"
+    b = "function f(a) { return a + 1; } /* add */"
+    assert canonical_fingerprint(a).startswith("tok:")
+    assert canonical_fingerprint(a) == canonical_fingerprint(b)
+    assert canonical_fingerprint('let s = "x";') == canonical_fingerprint("let s = 'x';")
+
+
+def test_deeply_nested_expression_falls_back_to_tokens():
+    code = "def f(a):\n    return " + "+".join(["a"] * 600) + "\n"
+    compile(code, "<test>", "exec")
+    assert canonical_fingerprint(code).startswith("tok:")
+
+
+def test_long_unary_chain_falls_back_to_tokens():
+    assert canonical_fingerprint("x = " + "-" * 100000 + "1\n").startswith("tok:")
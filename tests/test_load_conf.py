@@ -0,0 +1,45 @@
+import json
+import math
+
+import pytest
+import yaml
+
+from API.Validation_engine.load_conf import load_content, sniff_format
+
+
+def _baseline(content):
+    # Parsing before format sniffing: json.loads first, YAML if that fails
+    try:
+        return json.loads(content)
+    except json.JSONDecodeError:
+        return yaml.safe_load(content)
+
+
+@pytest.mark.parametrize("content", [
+    '{"a": 1}', "[1, 2]", '"text"', "-1.5", "42", "true", "false", "null",
+    "NaN", "Infinity", "-Infinity", " \n{\"a\": [1, 2]}",
+    "a: 1", "- x\n- y", "name: 'Infinity'", "Nope", "tru: 1", "{a: 1}", "",
+])
+def test_results_match_json_then_yaml(content):
+    valid, error, data = load_content(content)
+    assert valid, error
+    expected = _baseline(content)
+    if isinstance(expected, float) and math.isnan(expected):
+        assert isinstance(data, float) and math.isnan(data)
+    else:
+        assert data == expected and type(data) is type(expected)
+
+
+def test_sniff_format():
+    assert sniff_format("\ufeff {}") == "json"
+    assert sniff_format("NaN") == "json"
+    assert sniff_format("key: value") == "yaml"
+
+
+def test_explicit_json_reports_json_errors():
+    valid, error, _ = load_content("a: 1", "json")
+    assert not valid and error.startswith("JSON Error")
+
+
+def test_unsupported_format():
+    assert load_content("{}", "toml") == (False, "Unsupported format: toml", None)
@@ -0,0 +1,84 @@
+from API.Test_generator.units import extract_units, match_unit
+
+
+JS_TAX = (
+    "const RATE = {rate};\n"
+    "function tax(x) {{\n"
+    "  return x * RATE;\n"
+    "}}\n"
+    "function total(x) {{\n"
+    "  return x + x * RATE;\n"
+    "}}\n"
+)
+
+
+def test_python_units_and_residue():
+    code = "import os\n\n@decorator\ndef a(x):\n    return x\n\nclass B:\n    pass\n\nVALUE = 1\n"
+    units, residue = extract_units(code, "python")
+    assert units == {"a": "@decorator\ndef a(x):\n    return x\n", "B": "class B:\n    pass\n"}
+    assert "import os" in residue and "VALUE = 1" in residue
+
+
+def test_python_syntax_error_falls_back_to_residue():
+    code = "def broken(:\n    pass\n"
+    assert extract_units(code, "python") == ({}, code)
+
+
+def test_brace_units():
+    code = "function a() {\n  return '}';\n}\nconst b = (x) => {\n  return x;\n};\nclass C {\n  m() {}\n}\n"
+    units, residue = extract_units(code, "javascript")
+    assert set(units) == {"a", "b", "C"}
+    assert units["b"] == "const b = (x) => {\n  return x;\n};"
+    assert residue.strip() == ""
+
+
+def test_top_level_statement_stays_in_residue():
+    units, residue = extract_units(JS_TAX.format(rate="0.1"), "javascript")
+    assert units["tax"].startswith("function tax")
+    assert "RATE = 0.1" in residue
+    assert all("RATE = 0.1" not in source for source in units.values())
+
+
+def test_changing_a_top_level_constant_changes_only_the_residue():
+    before = extract_units(JS_TAX.format(rate="0.1"), "javascript")
+    after = extract_units(JS_TAX.format(rate="0.2"), "javascript")
+    assert before[0] == after[0]
+    assert before[1] != after[1]
+
+
+def test_statements_before_a_declaration_stay_in_residue():
+    code = "import a from 'a';\nconst b = require('b');\nif (a) { b(); }\nexport function f() {\n  return 1;\n}\n"
+    units, residue = extract_units(code, "javascript")
+    assert units == {"f": "export function f() {\n  return 1;\n}"}
+    assert "import a from 'a';" in residue and "require('b')" in residue and "if (a) { b(); }" in residue
+
+
+def test_declaration_on_the_same_line_as_a_statement():
+    units, residue = extract_units("const RATE = 0.1; function tax(x) { return x * RATE; }", "javascript")
+    assert units["tax"].startswith("function tax")
+    assert residue.strip() == "const RATE = 0.1;"
+
+
+def test_c_function_header():
+    code = "#include <stdio.h>\nint x = 1;\nstatic int add(int a, int b)\n{\n  return a + b;\n}\n"
+    units, residue = extract_units(code, "c")
+    assert units == {"add": "static int add(int a, int b)\n{\n  return a + b;\n}"}
+    assert "int x = 1;" in residue
+
+
+def test_duplicate_names_are_suffixed():
+    units, _ = extract_units("function f() {}\nfunction f() {}\n", "javascript")
+    assert set(units) == {"f", "f_2"}
+
+
+def test_match_unit():
+    names = ["Calculator", "add"]
+    assert match_unit({"target": "Calculator.add"}, names) == "Calculator"
+    assert match_unit({"target": "add"}, names) == "add"
+    assert match_unit({"target": "the add function"}, names) == "add"
+    assert match_unit({"target": "integration"}, names) is None
+
+
+def test_python_too_deeply_nested_falls_back_to_residue():
+    code = "x = " + "-" * 100000 + "1\n"
+    assert extract_units(code, "python") == ({}, code)
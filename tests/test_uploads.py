@@ -0,0 +1,72 @@
+import asyncio
+import gzip
+import io
+import zlib
+
+import pytest
+from fastapi import HTTPException, UploadFile
+
+from API.uploads import _inflate, read_upload
+
+
+def _decompressor():
+    return zlib.decompressobj(16 + zlib.MAX_WBITS)
+
+
+def _inflate_all(data, limit, chunk_size=1024):
+    decompressor = _decompressor()
+    output = b""
+    for start in range(0, len(data), chunk_size):
+        output += _inflate(decompressor, data[start:start + chunk_size], limit - len(output))
+        if len(output) > limit:
+            break
+    return decompressor, output
+
+
+def _read(content, filename="config.json.gz", max_bytes=1024):
+    upload = UploadFile(io.BytesIO(content), filename=filename)
+    return asyncio.run(read_upload(upload, max_bytes=max_bytes))
+
+
+def test_inflate_within_limit():
+    payload = b"hello world " * 100
+    decompressor, output = _inflate_all(gzip.compress(payload), len(payload))
+    assert output == payload
+    assert decompressor.eof
+
+
+def test_inflate_stops_just_past_the_limit():
+    decompressor = _decompressor()
+    output = _inflate(decompressor, gzip.compress(b"\0" * 10_000_000), 1000)
+    assert len(output) == 1001
+    assert decompressor.unconsumed_tail
+
+
+def test_inflate_resumes_from_unconsumed_tail():
+    payload = bytes(range(256)) * 64
+    decompressor = _decompressor()
+    first = _inflate(decompressor, gzip.compress(payload), 100)
+    rest = _inflate(decompressor, b"", len(payload))
+    assert first + rest == payload
+
+
+def test_read_upload_decompresses_gzip():
+    assert _read(gzip.compress(b'{"a": 1}')) == '{"a": 1}'
+
+
+def test_read_upload_rejects_gzip_bomb():
+    with pytest.raises(HTTPException) as error:
+        _read(gzip.compress(b"\0" * 10_000_000), max_bytes=1024)
+    assert error.value.status_code == 413
+
+
+def test_read_upload_rejects_truncated_gzip():
+    with pytest.raises(HTTPException) as error:
+        _read(gzip.compress(b"x" * 1000)[:-12])
+    assert error.value.status_code == 400
+
+
+def test_read_upload_rejects_plain_file_over_limit():
+    with pytest.raises(HTTPException) as error:
+        _read(b"x" * 2048, filename="config.json")
+    assert error.value.status_code == 413